@@ -90,7 +90,7 @@ def tif_composition(ref_tif_path, src_tif_paths, dst_tif_path, dst_tif_dtype_gda
         dtype_gdal = dst_tif_dtype_gdal
         
     # cal bands count
-    bands_for_each_tif = [tgp.get_raster_info(tif_path)[2] for tif_path in src_tif_paths]
+    bands_for_each_tif = tgp.scan_rasters(src_tif_paths)['bands'].tolist()
     bands = sum(bands_for_each_tif)
 
     # bands compositions: create new tif
@@ -1,6 +1,7 @@
 import os
+import numba
 import numpy as np
-from numba import jit
+from numba import jit, prange
 from osgeo import gdal
 import TronGisPy as tgp
 from scipy.interpolate import griddata
@@ -57,69 +58,81 @@ def img_interpolation(data, method='linear', no_data_value=None):
         data_interp[:,:,b] = __band_interpolation(data_interp[:,:,b], method='linear', no_data_value=None)
     return data_interp
 
-@jit(nopython=True) # Set "nopython" mode for best performance, equivalent to @njit
-def __jit_majority_interpolation(X_stacked, no_data_value): # Function is compiled to machine code when called the first time
-    X_interp = np.zeros((X_stacked.shape[0], X_stacked.shape[1]), dtype=np.int32)
-    for i in range(X_interp.shape[0]):
+@jit(nopython=True, cache=True)
+def __jit_majority(vals):
+    """The majority of vals. The smallest value is returned if there are multiple majorities."""
+    vals.sort()
+    majority, max_count, count = vals[0], 1, 1
+    for k in range(1, vals.shape[0]):
+        count = count + 1 if vals[k] == vals[k-1] else 1
+        if count > max_count:
+            majority, max_count = vals[k], count
+    return majority
+
+@jit(nopython=True, parallel=True, cache=True) # rows are processed in parallel, and the compiled function is cached on disk
+def __jit_majority_interpolation(X_padded, no_data_value, window_size): # Function is compiled to machine code when called the first time
+    pad_size = window_size // 2
+    X_interp = np.zeros((X_padded.shape[0]-2*pad_size, X_padded.shape[1]-2*pad_size), dtype=np.int32)
+    for i in prange(X_interp.shape[0]):
+        vals = np.empty(window_size*window_size, dtype=X_padded.dtype)
         for j in range(X_interp.shape[1]):
-            if X_stacked[i,j][4] == no_data_value: # only calculate majority when value is no_data_value
-                vals = X_stacked[i,j][X_stacked[i,j]!=no_data_value]
-                v_len = vals.shape[0]
+            if X_padded[i+pad_size, j+pad_size] == no_data_value: # only calculate majority when value is no_data_value
+                v_len = 0
+                for wi in range(window_size): # read the neighbours from X_padded directly
+                    for wj in range(window_size):
+                        if X_padded[i+wi, j+wj] != no_data_value:
+                            vals[v_len] = X_padded[i+wi, j+wj]
+                            v_len += 1
                 if v_len !=0: # if at least one value in the convolution is not no_data_value
-                    X_interp[i, j] = np.bincount(vals).argmax() # calculate majority 
+                    X_interp[i, j] = __jit_majority(vals[:v_len]) # calculate majority 
                 else: 
                     X_interp[i, j] = no_data_value
             else:
-                X_interp[i, j] = X_stacked[i,j][4]
+                X_interp[i, j] = X_padded[i+pad_size, j+pad_size]
     return X_interp
 
-@jit(nopython=True) # Set "nopython" mode for best performance, equivalent to @njit
-def __jit_mean_interpolation(X_stacked, no_data_value): # Function is compiled to machine code when called the first time
-    X_interp = np.zeros((X_stacked.shape[0], X_stacked.shape[1]))
-    for i in range(X_interp.shape[0]):
+@jit(nopython=True, parallel=True, cache=True) # rows are processed in parallel, and the compiled function is cached on disk
+def __jit_mean_interpolation(X_padded, no_data_value, window_size): # Function is compiled to machine code when called the first time
+    pad_size = window_size // 2
+    X_interp = np.zeros((X_padded.shape[0]-2*pad_size, X_padded.shape[1]-2*pad_size))
+    for i in prange(X_interp.shape[0]):
         for j in range(X_interp.shape[1]):
-            if X_stacked[i,j][4] == no_data_value: # only calculate majority when value is no_data_value
-                vals = X_stacked[i,j][X_stacked[i,j]!=no_data_value]
-                v_len = vals.shape[0]
+            if X_padded[i+pad_size, j+pad_size] == no_data_value: # only calculate mean when value is no_data_value
+                v_sum, v_len = 0.0, 0
+                for wi in range(window_size): # read the neighbours from X_padded directly
+                    for wj in range(window_size):
+                        if X_padded[i+wi, j+wj] != no_data_value:
+                            v_sum += X_padded[i+wi, j+wj]
+                            v_len += 1
                 if v_len !=0: # if at least one value in the convolution is not no_data_value
-                    X_interp[i, j] = np.mean(vals) # calculate mean
+                    X_interp[i, j] = v_sum / v_len # calculate mean
                 else: 
                     X_interp[i, j] = no_data_value
             else:
-                X_interp[i, j] = X_stacked[i,j][4]
+                X_interp[i, j] = X_padded[i+pad_size, j+pad_size]
     return X_interp
 
-def __generate_stacked_X(X_padded, ws):
-    """
-    X_stacked = np.stack([
-        X_padded[0:-2, 0:-2], X_padded[1:-1, 0:-2], X_padded[2:, 0:-2],
-        X_padded[0:-2, 1:-1], X_padded[1:-1, 1:-1], X_padded[2:, 1:-1],
-        X_padded[0:-2, 2:  ], X_padded[1:-1, 2:  ], X_padded[2:, 2:  ]
-        ] , axis=-1)
-    """
-    rows, cols = X_padded.shape
-    X_stacked = []
-    for i in range(ws):
-        for j in range(ws):
-            X_stacked.append(X_padded[i:rows-(ws-i)+1, j:cols-(ws-j)+1])
-    X_stacked = np.stack(X_stacked, axis=-1)
-    return X_stacked
-
 def __majority_interpolation_single(X, no_data_value, window_size):
     pad_size = int((window_size -1) / 2)
     X_padded = np.pad(X, ((pad_size, pad_size), (pad_size, pad_size)), mode='edge')
-    X_stacked = __generate_stacked_X(X_padded, window_size)
-    X_interp = __jit_majority_interpolation(X_stacked, no_data_value=no_data_value)
+    X_interp = __jit_majority_interpolation(X_padded, no_data_value=no_data_value, window_size=window_size)
     return X_interp
 
 def __mean_interpolation_single(X, no_data_value, window_size):
     pad_size = int((window_size -1) / 2)
     X_padded = np.pad(X, ((pad_size, pad_size), (pad_size, pad_size)), mode='edge')
-    X_stacked = __generate_stacked_X(X_padded, window_size)
-    X_interp = __jit_mean_interpolation(X_stacked, no_data_value=no_data_value)
+    X_interp = __jit_mean_interpolation(X_padded, no_data_value=no_data_value, window_size=window_size)
     return X_interp
 
-def majority_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_all=True, loop_limit=5):
+def __set_num_threads(n_threads):
+    """Set the number of threads used by numba and return the original one."""
+    n_threads_ori = numba.get_num_threads()
+    if n_threads is not None:
+        assert 1 <= n_threads <= numba.config.NUMBA_NUM_THREADS, "n_threads should be between 1 and " + str(numba.config.NUMBA_NUM_THREADS)
+        numba.set_num_threads(n_threads)
+    return n_threads_ori
+
+def majority_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_all=True, loop_limit=5, n_threads=None):
     """Interpolate values on specific cells (generally nan cell) using 
     the majority value in the window.
 
@@ -133,12 +146,16 @@ def majority_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_
         use np.nan as no_data_value.
     window_size: int, optional, default: 3
         The size of the window of the convolution to calculate the majority value. 
-        Window_size should be odd number.
+        Window_size should be odd number. The neighbours are read from the padded 
+        data directly, so the memory usage does not grow with window_size.
     loop_to_fill_all: bool, optional, default: True
         Fill all no_data_value until there is no no_data_value value in the data.
     loop_limit: int, optional, default: 5
         The maximum limitation on loop. if loop_to_fill_all==True, loop_limit will 
         be considered. `-1` means no limitation.
+    n_threads: int, optional
+        The number of threads to process the rows in parallel. If None, all threads 
+        of numba (`numba.config.NUMBA_NUM_THREADS`) are used.
 
     Returns
     -------
@@ -166,18 +183,22 @@ def majority_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_
     assert len(data.shape) == 2, "data should have onle 2 dimension"
     assert np.issubdtype(data.dtype, np.integer), "data should be in integer type"
     assert window_size%2==1 , "window_size should be odd number"
-    data_interp = __majority_interpolation_single(data, no_data_value=no_data_value, window_size=window_size)
-    if loop_to_fill_all and (loop_limit != -1):
-        loop_count = 0
-        while (np.sum(data_interp==no_data_value) > 0) and loop_count<loop_limit:
-            data_interp = __majority_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
-            loop_count += 1    
-    elif loop_to_fill_all and (loop_limit == -1):
-        while np.sum(data_interp==no_data_value) > 0:
-            data_interp = __majority_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
+    n_threads_ori = __set_num_threads(n_threads)
+    try:
+        data_interp = __majority_interpolation_single(data, no_data_value=no_data_value, window_size=window_size)
+        if loop_to_fill_all and (loop_limit != -1):
+            loop_count = 0
+            while (np.sum(data_interp==no_data_value) > 0) and loop_count<loop_limit:
+                data_interp = __majority_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
+                loop_count += 1    
+        elif loop_to_fill_all and (loop_limit == -1):
+            while np.sum(data_interp==no_data_value) > 0:
+                data_interp = __majority_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
+    finally:
+        numba.set_num_threads(n_threads_ori)
     return data_interp
 
-def mean_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_all=True, loop_limit=5):
+def mean_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_all=True, loop_limit=5, n_threads=None):
     """Interpolate values on specific cells (no_data_value) using 
     the mean value in the window.
 
@@ -191,12 +212,16 @@ def mean_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_all=
         use np.nan as no_data_value.
     window_size: int, optional, default: 3
         The size of the window of the convolution to calculate the majority value. 
-        Window_size should be odd number.
+        Window_size should be odd number. The neighbours are read from the padded 
+        data directly, so the memory usage does not grow with window_size.
     loop_to_fill_all: bool, optional, default: True
         Fill all no_data_value until there is no no_data_value value in the data.
     loop_limit: int, optional, default: 5
         The maximum limitation on loop. if loop_to_fill_all==True, loop_limit will 
         be considered. `-1` means no limitation.
+    n_threads: int, optional
+        The number of threads to process the rows in parallel. If None, all threads 
+        of numba (`numba.config.NUMBA_NUM_THREADS`) are used.
 
     Returns
     -------
@@ -222,15 +247,19 @@ def mean_interpolation(data, no_data_value=999, window_size=3, loop_to_fill_all=
     """
     assert len(data.shape) == 2, "data should have onle 2 dimension"
     assert window_size%2==1 , "window_size should be odd number"
-    data_interp = __mean_interpolation_single(data, no_data_value=no_data_value, window_size=window_size)
-    if loop_to_fill_all and (loop_limit != -1): # with loop_limit
-        loop_count = 0
-        while (np.sum(data_interp==no_data_value) > 0) and loop_count<loop_limit:
-            data_interp = __mean_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
-            loop_count += 1    
-    elif loop_to_fill_all and (loop_limit == -1): # without loop_limit
-        while np.sum(data_interp==no_data_value) > 0:
-            data_interp = __mean_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
+    n_threads_ori = __set_num_threads(n_threads)
+    try:
+        data_interp = __mean_interpolation_single(data, no_data_value=no_data_value, window_size=window_size)
+        if loop_to_fill_all and (loop_limit != -1): # with loop_limit
+            loop_count = 0
+            while (np.sum(data_interp==no_data_value) > 0) and loop_count<loop_limit:
+                data_interp = __mean_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
+                loop_count += 1    
+        elif loop_to_fill_all and (loop_limit == -1): # without loop_limit
+            while np.sum(data_interp==no_data_value) > 0:
+                data_interp = __mean_interpolation_single(data_interp, no_data_value=no_data_value, window_size=window_size)
+    finally:
+        numba.set_num_threads(n_threads_ori)
     return data_interp
 
 def gdal_fillnodata(raster, band=0, no_data_value=999, max_distance=100, smoothing_iterations=0):
@@ -36,13 +36,15 @@ class Raster():
     (271982.8783, 272736.8295, 2769215.7524, 2769973.0653)
     """
 
-    def __init__(self, data, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None):
+    def __init__(self, data, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None, fp=None, copy=True):
         """Initializing Raster object.
 
         Parameters
         ----------
-        data: array_like
+        data: array_like or None
             Digital number for each raster cell. Data is in (n_rows, n_cols, n_bands) shape.
+            If None, `fp` should be given and the data will not be read from the file 
+            until `Raster.data` is touched.
         geo_transform: tuple or list, optional
             Affine transform parameters (c, a, b, f, d, e = geo_transform). 
         projection: str, optional
@@ -56,10 +58,28 @@ class Raster():
             Define which value to replace nan in numpy array when saving a raster file.
         metadata: dict, optional
             Define the metadata of the raster file.
+        fp: str, optional
+            File path of the raster file to lazily read the data from when data is None. 
+            The geo-information not given will be read from the file.
+        copy: bool, optional, default: True
+            Copy the data. If False, the raster holds the given array itself, so 
+            no extra memory is used but changing the array changes the raster.
         """
-        if len(data.shape) == 2:
-            data = np.expand_dims(data, axis=2)
-        self.data = data
+        self.__fp = fp
+        if data is None:
+            assert fp is not None, "fp should be given if data is None"
+            rows, cols, bands, fp_geo_transform, fp_projection, fp_gdaldtype, fp_no_data_value, fp_metadata = tgp.get_raster_info(fp)
+            self.__data, self.__fp_shape = None, (rows, cols, bands)
+            geo_transform = fp_geo_transform if geo_transform is None else geo_transform
+            projection = fp_projection if projection is None else projection
+            gdaldtype = fp_gdaldtype if gdaldtype is None else gdaldtype
+            no_data_value = fp_no_data_value if no_data_value is None else no_data_value
+            metadata = fp_metadata if metadata is None else metadata
+        else:
+            if len(data.shape) == 2:
+                data = np.expand_dims(data, axis=2)
+            self.__fp_shape = None
+            self.__set_data(data, copy=copy)
         self.geo_transform = geo_transform if geo_transform is not None else [0, 1, 0, 0, 0, -1]
         self.gdaldtype = gdaldtype if gdaldtype is not None else tgp.npdtype_to_gdaldtype(data.dtype)
         self.projection = projection
@@ -80,22 +100,28 @@ class Raster():
     @property
     def rows(self):
         """Number of rows."""
-        return self.data.shape[0]
+        return self.shape[0]
         
     @property
     def cols(self):
         """Number of cols."""
-        return self.data.shape[1]
+        return self.shape[1]
 
     @property
     def bands(self):
         """Number of bands."""
-        return self.data.shape[2]
+        return self.shape[2]
         
     @property
     def shape(self):
         """The shape of the raster data."""
-        return self.data.shape
+        return self.__data.shape if self.__data is not None else self.__fp_shape
+
+    @property
+    def fp(self):
+        """File path of the raster file the data is lazily read from. None 
+        if the raster is not opened by `TronGisPy.open_raster`."""
+        return self.__fp
 
     @property
     def gdaldtype_name(self):
@@ -103,16 +129,24 @@ class Raster():
 
     @property
     def data(self):
-        """The digital number for each cell of the raster. Data is in (n_rows, n_cols, n_bands) shape."""
+        """The digital number for each cell of the raster. Data is in (n_rows, n_cols, n_bands) shape.
+        If the raster is opened by `TronGisPy.open_raster`, the data will be read from the file 
+        when it is touched the first time."""
+        if self.__data is None:
+            self.__data = tgp.get_raster_data(self.__fp)
         return self.__data
 
     @data.setter
     def data(self, data):
         """Reset the data"""
-        assert type(data) == np.ndarray, "data should be numpy.ndarray type"
+        self.__set_data(data, copy=True)
+
+    def __set_data(self, data, copy=True):
+        """Reset the data. If copy is False, the array will not be copied."""
+        assert isinstance(data, np.ndarray), "data should be numpy.ndarray type"
         if len(data.shape) == 2:
             data = np.expand_dims(data, axis=2)
-        self.__data = data.copy()
+        self.__data = data.copy() if copy else data
         self.update_gdaldtype_by_npdtype()
         self.cache_data_for_plot = None
 
@@ -185,6 +219,40 @@ class Raster():
             assert False, "This indexing method is not supported currently! Please use raster[<row_idx_st>:<row_idx_end>, <col_idx_st>:<col_idx_end>] to slice"
         
 
+    def read_window(self, window=None, bands=None):
+        """Read the cells in the window as a new Raster object. If the data of the 
+        raster has not been loaded, only the window will be read from the file.
+
+        Parameters
+        ----------
+        window: tuple of int, optional
+            (row_off, col_off, rows, cols) window to read. If None, read the whole raster.
+        bands: list of int, optional
+            Which bands to read (start from 0). If None, read all bands.
+
+        Returns
+        -------
+        dst_raster: Raster
+            The raster of the window whose geo_transform is shifted to the window.
+
+        Examples
+        --------
+        >>> import TronGisPy as tgp
+        >>> raster = tgp.open_raster(tgp.get_testing_fp())
+        >>> raster.read_window((100, 200, 50, 60)).shape
+        (50, 60, 3)
+        """
+        window = (0, 0, self.rows, self.cols) if window is None else window
+        row_off, col_off, rows, cols = window
+        assert (row_off >= 0) and (col_off >= 0) and (row_off + rows <= self.rows) and (col_off + cols <= self.cols), "window should be inside the raster"
+        bands = list(range(self.bands)) if bands is None else bands
+        if self.__data is None:
+            data = tgp.get_raster_data(self.__fp, window=window, bands=bands)
+        else:
+            data = self.__data[row_off:row_off+rows, col_off:col_off+cols][:, :, bands]
+        geo_transform = tgp.get_window_geo_transform(self.geo_transform, window)
+        return Raster(data, geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata, copy=False)
+
     def astype(self, dtype, update_gdaldtype=True):
         """Change dtype of self.data.
 
@@ -197,8 +265,7 @@ class Raster():
             Change gdaldtype according to `self.data.dtype`.
         """
         assert type(dtype) is type, "dtype should type type"
-        self.data = self.data.astype(dtype)
-        self.update_gdaldtype_by_npdtype()
+        self.__set_data(self.data.astype(dtype), copy=False)
 
     def get_values_by_coords(self, coords):
         """get the data digital values of the coordinates
@@ -224,7 +291,7 @@ class Raster():
         """
         self.gdaldtype = tgp.npdtype_to_gdaldtype(self.data.dtype)
 
-    def to_file(self, fp):
+    def to_file(self, fp, creation_options=None, cog=False, overview_resampling='average', block_size=512, compress='DEFLATE', overview_levels=None):
         """Save the file. It is recommended to save the file using tif format, that is 
         use '.tif' as its extension.
 
@@ -232,8 +299,27 @@ class Raster():
         ----------
         fp: str
             File path.
+        creation_options: list or dict, optional
+            GTiff creation options e.g. ['TILED=YES', 'COMPRESS=DEFLATE', 'PREDICTOR=2', 
+            'BIGTIFF=IF_SAFER']. See also `TronGisPy.RasterWriter`.
+        cog: bool, optional, default: False
+            Save as Cloud-Optimized GeoTIFF with internal overviews. See also `TronGisPy.write_cog`.
+        overview_resampling: str, optional, default: average
+            If cog is True, the resampling algorithm used to build the overviews.
+        block_size: int, optional, default: 512
+            If cog is True, the size of the internal tiles.
+        compress: {'DEFLATE', 'LZW', 'ZSTD', 'NONE'}, optional, default: DEFLATE
+            If cog is True, the compression method.
+        overview_levels: list of int, optional
+            If cog is True, the decimation factors of the overviews e.g. [2, 4, 8]. If None, 
+            keep halving the resolution until the overview fits in one tile.
         """
-        tgp.write_raster(fp, self.data, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata)
+        if cog:
+            tgp.write_cog(fp, self.data, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata, 
+                          block_size=block_size, compress=compress, overview_resampling=overview_resampling, 
+                          overview_levels=overview_levels, creation_options=creation_options)
+        else:
+            tgp.write_raster(fp, self.data, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata, creation_options)
 
     def to_gdal_ds(self):
         """Export raster object to `gdal.DataSource`.
@@ -255,12 +341,12 @@ class Raster():
         no_data_value: int, optional
             If None, `self.no_data_value` will be used, else self.no_data_value will be re-assigned.
         """
-        data = self.data.copy()
         self.no_data_value =  self.no_data_value if no_data_value is None else no_data_value
+        data = self.data.copy()
         data[np.isnan(data)] = self.no_data_value
-        self.data = data
+        self.__set_data(data, copy=False)
 
-    def fill_no_data(self, mode='constant', no_data_value=None, constant=0, window_size=3, loop_to_fill_all=True, loop_limit=5, fill_na=True):
+    def fill_no_data(self, mode='constant', no_data_value=None, constant=0, window_size=3, loop_to_fill_all=True, loop_limit=5, fill_na=True, n_threads=None):
         """Fill no_data cell of the raster object.
         
         Parameters
@@ -284,26 +370,53 @@ class Raster():
             limitation on loop. if loop_to_fill_all==True, loop_limit will be considered. `-1` means 
             no limitation. See also `TronGisPy.Interpolation.mean_interpolation` or 
             `TronGisPy.Interpolation.majority_interpolation`.
+        n_threads: int, optional
+            If `neighbor_mean` or `neighbor_majority` mode is used, the number of threads to 
+            fill the cells in parallel. If None, all threads of numba are used.
         """
         self.no_data_value =  self.no_data_value if no_data_value is None else no_data_value
         if fill_na and np.sum(np.isnan(self.data)) > 0:
             self.fill_na(self.no_data_value)
 
-        data = self.data.copy()
+        # build a new array instead of modifying self.data in place, so the buffer shared 
+        # with the shallow copies of the raster (see `Raster.copy`) will not be changed.
         if mode == 'constant':
+            data = self.data.copy()
             data[data == self.no_data_value] = constant
-            self.data = data
+            self.__set_data(data, copy=False)
             self.no_data_value = constant
         elif mode == 'neighbor_mean':
+            data = np.empty_like(self.data)
             for i in range(self.bands):
-                self.data[:, :, i] = Interpolation.mean_interpolation(data[:, :, i], no_data_value=self.no_data_value, window_size=window_size, loop_to_fill_all=loop_to_fill_all, loop_limit=loop_limit) 
+                data[:, :, i] = Interpolation.mean_interpolation(self.data[:, :, i], no_data_value=self.no_data_value, window_size=window_size, loop_to_fill_all=loop_to_fill_all, loop_limit=loop_limit, n_threads=n_threads)
+            self.__set_data(data, copy=False)
         elif mode == 'neighbor_majority':
+            data = np.empty_like(self.data)
             for i in range(self.bands):
-                self.data[:, :, i] = Interpolation.majority_interpolation(data[:, :, i], no_data_value=self.no_data_value, window_size=window_size, loop_to_fill_all=loop_to_fill_all, loop_limit=loop_limit)
+                data[:, :, i] = Interpolation.majority_interpolation(self.data[:, :, i], no_data_value=self.no_data_value, window_size=window_size, loop_to_fill_all=loop_to_fill_all, loop_limit=loop_limit, n_threads=n_threads)
+            self.__set_data(data, copy=False)
+
+    def copy(self, deep=True):
+        """copy raster object.
 
-    def copy(self):
-        """copy raster object."""
-        return Raster(self.data, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata)
+        Parameters
+        ----------
+        deep: bool, optional, default: True
+            If False, the data buffer is shared with the original raster instead of 
+            being copied, and the data of both rasters becomes read-only, so assigning 
+            values to `Raster.data[...]` raises ValueError instead of changing the 
+            other raster. `Raster.astype`, `Raster.fill_na`, `Raster.fill_no_data` and 
+            setting `Raster.data` (e.g. `raster.data = raster.data`) give the raster its 
+            own writable buffer.
+        """
+        if self.__data is None:
+            return Raster(None, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata, fp=self.__fp)
+        if deep:
+            return Raster(self.data, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata)
+        shared_data = self.__data.view()
+        shared_data.flags.writeable = False
+        self.__data = shared_data
+        return Raster(shared_data, self.geo_transform, self.projection, self.gdaldtype, self.no_data_value, self.metadata, copy=False)
 
     def refine_resolution(self, dst_resolution, resample_alg='near', extent=None, rotate=True):
         """Refine the resolution of the raster.
@@ -523,7 +636,9 @@ class Raster():
         log: bool, optional, default: False
             Get the log value of data to show the image.
         rescale_percentage: float, optional
-            The percentage to recale (resize) the image for efficient showing.
+            The percentage to recale (resize) the image for efficient showing. If the 
+            raster is opened by `TronGisPy.open_raster` and the data is not loaded, the 
+            rescaled image will be read from the overviews of the file directly.
         bands: list, optional
             Which bands to plot. Length of bands should be 1, 3 or 4.
             If 3 bands is used, each of them will be defined as rgb bands. 
@@ -544,12 +659,18 @@ class Raster():
         assert len(bands) in [1, 3, 4], "length of bands should be 1, 3 or 4"
 
         if (self.cache_data_for_plot is None) or flush_cache:
-            # reshape to valid shape for matplotlib
-            if len(bands) == 1:
-                data = self.data[:, :, bands[0]]
+            # read the rescaled image from the file without loading the data
+            if (self.__data is None) and (rescale_percentage is not None):
+                out_shape = (int(self.rows*rescale_percentage), int(self.cols*rescale_percentage))
+                data = tgp.get_raster_data(self.__fp, bands=bands, out_shape=out_shape, resample_alg='average')
+                rescale_percentage = None
             else:
                 data = self.data[:, :, bands]
 
+            # reshape to valid shape for matplotlib
+            if len(bands) == 1:
+                data = data[:, :, 0]
+
             # deal with no data
             data = data.astype(float)
             if nan_no_data:
@@ -0,0 +1,136 @@
+import numpy as np
+from osgeo import gdal
+from osgeo import gdal_array
+import TronGisPy as tgp
+
+class RasterWriter():
+    """RasterWriter writes a GeoTIFF file window by window, so the raster
+    larger than the memory can be written without holding the whole array.
+    GDAL creation options such as tiling, compression and BigTIFF can be set
+    when creating the file.
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp
+    >>> src_fp = tgp.get_testing_fp()
+    >>> rows, cols, bands, geo_transform, projection, gdaldtype, no_data_value = tgp.get_raster_info(src_fp, ['rows', 'cols', 'bands', 'geo_transform', 'projection', 'gdaldtype', 'no_data_value'])
+    >>> creation_options = ['TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'COMPRESS=DEFLATE', 'PREDICTOR=2', 'BIGTIFF=IF_SAFER']
+    >>> with tgp.RasterWriter('dst.tif', rows, cols, bands, gdaldtype, geo_transform, projection, no_data_value, creation_options=creation_options) as writer:
+    ...     for window, raster in tgp.iter_blocks(src_fp):
+    ...         writer.write_window(raster.data, window)
+    """
+
+    def __init__(self, fp, rows, cols, bands, gdaldtype, geo_transform=None, projection=None, no_data_value=None, metadata=None, creation_options=None):
+        """Create the raster file to be written.
+
+        Parameters
+        ----------
+        fp: str
+            File path of the raster file.
+        rows: int
+            Number of rows.
+        cols: int
+            Number of cols.
+        bands: int
+            Number of bands.
+        gdaldtype: int
+            The type of the cell defined in gdal which will affect the information
+            to be stored when saving the file. This can be generate from `gdal.GDT_XXX`
+            such as `gdal.GDT_Int32` equals 5 and `gdal.GDT_Float32` equals 6.
+        geo_transform: tuple or list, optional
+            Affine transform parameters (c, a, b, f, d, e = geo_transform).
+        projection: str, optional
+            The well known text (WKT) of the raster which can be generate from `TronGisPy.epsg_to_wkt(<epsg_code>)`
+        no_data_value: int or float, optional
+            Define which value to replace nan in numpy array when saving a raster file.
+        metadata: dict, optional
+            Define the metadata of the raster file.
+        creation_options: list or dict, optional
+            GTiff creation options e.g. ['TILED=YES', 'BLOCKXSIZE=512', 'BLOCKYSIZE=512',
+            'COMPRESS=DEFLATE', 'PREDICTOR=2', 'BIGTIFF=IF_SAFER'] or {'TILED': 'YES',
+            'COMPRESS': 'ZSTD'}. COMPRESS can be DEFLATE, LZW or ZSTD. Use PREDICTOR=2 for
+            integer and PREDICTOR=3 for floating point data.
+        """
+        self.fp = fp
+        self.rows, self.cols, self.bands = rows, cols, bands
+        self.gdaldtype = gdaldtype
+        self.creation_options = get_creation_options(creation_options)
+        self.ds = gdal.GetDriverByName('GTiff').Create(fp, cols, rows, bands, gdaldtype, options=self.creation_options)
+        assert self.ds is not None, "cannot create the raster file: " + str(fp)
+        if geo_transform is not None:
+            self.ds.SetGeoTransform(geo_transform)
+        if projection is not None:
+            self.ds.SetProjection(projection)
+        if metadata is not None:
+            self.ds.SetMetadata(metadata)
+        if no_data_value is not None:
+            for b in range(bands):
+                self.ds.GetRasterBand(b+1).SetNoDataValue(no_data_value)
+
+    def __repr__(self):
+        desc = ""
+        desc += "fp: {fp}\n".format(fp=self.fp)
+        desc += "shape: ({rows}, {cols}, {bands})\n".format(rows=self.rows, cols=self.cols, bands=self.bands)
+        desc += "gdaldtype: {gdaldtype}\n".format(gdaldtype=tgp.get_gdaldtype_name(self.gdaldtype))
+        desc += "creation_options: {creation_options}".format(creation_options=self.creation_options)
+        return desc
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_window(self, data, window=None):
+        """Write the data into the window of the raster file.
+
+        Parameters
+        ----------
+        data: array_like
+            The digital number for each cell of the window. Data is in
+            (n_rows, n_cols, n_bands) shape.
+        window: tuple of int, optional
+            (row_off, col_off) or (row_off, col_off, rows, cols) window to write.
+            If None, write from the left-top corner of the raster.
+        """
+        assert self.ds is not None, "the RasterWriter has been closed"
+        if len(data.shape) == 2:
+            data = np.expand_dims(data, axis=2)
+        rows, cols, bands = data.shape
+        window = (0, 0) if window is None else window
+        row_off, col_off = window[0], window[1]
+        if len(window) == 4:
+            assert (window[2], window[3]) == (rows, cols), "the shape of data should be the same as the window"
+        assert bands == self.bands, "the number of bands of data should be " + str(self.bands)
+        assert (row_off >= 0) and (col_off >= 0) and (row_off + rows <= self.rows) and (col_off + cols <= self.cols), "window should be inside the raster"
+        write_ds_window(self.ds, data, row_off, col_off)
+
+    def close(self):
+        """Flush the cache and close the raster file."""
+        if self.ds is not None:
+            self.ds.FlushCache()
+            self.ds = None
+
+def write_ds_window(ds, data, row_off=0, col_off=0):
+    """Write (rows, cols, bands) data into the window of gdal DataSource at once. The 
+    pixel-interleaved buffer is passed to gdal directly without splitting it into 
+    (strided) bands, so no copy is made if data is C-contiguous."""
+    rows, cols, bands = data.shape
+    buf_type = gdal_array.NumericTypeCodeToGDALTypeCode(data.dtype)
+    if buf_type is None: # e.g. bool
+        data = data.astype(tgp.gdaldtype_to_npdtype(ds.GetRasterBand(1).DataType))
+        buf_type = gdal_array.NumericTypeCodeToGDALTypeCode(data.dtype)
+    data = np.ascontiguousarray(data)
+    itemsize = data.dtype.itemsize
+    ds.WriteRaster(int(col_off), int(row_off), cols, rows, data, buf_type=buf_type, band_list=list(range(1, bands+1)),
+                   buf_pixel_space=itemsize*bands, buf_line_space=itemsize*bands*cols, buf_band_space=itemsize)
+
+def get_creation_options(creation_options):
+    """Convert the GTiff creation options into the list format of gdal,
+    e.g. {'TILED': 'YES'} => ['TILED=YES']."""
+    if creation_options is None:
+        return []
+    elif type(creation_options) == dict:
+        return ["{}={}".format(key, value) for key, value in creation_options.items()]
+    else:
+        return list(creation_options)
@@ -292,17 +292,16 @@ def clip_raster_with_polygon(src_raster, src_poly, all_touched=False, no_data_va
     src_poly_copy = src_poly.copy()
     src_poly_copy['value'] = 1
     src_poly_raster = rasterize_layer_by_ref_raster(src_poly_copy, src_raster, use_attribute='value', all_touched=all_touched, no_data_value=0)
-    dst_raster = src_raster.copy()
-    dst_raster.data[~(src_poly_raster.data[:, :, 0].astype(bool))] = no_data_value
-    
-    row_idxs, col_idxs, bands_idxs = np.where(src_poly_raster.data!=0)
+    mask = src_poly_raster.data[:, :, 0].astype(bool)
+    row_idxs, col_idxs = np.where(mask)
     rmin, rmax, cmin, cmax = np.min(row_idxs), np.max(row_idxs), np.min(col_idxs), np.max(col_idxs)
-    dst_raster.data = dst_raster.data[rmin:rmax+1, cmin:cmax+1]
+    data = src_raster.data[rmin:rmax+1, cmin:cmax+1].copy() # only copy the clipped part
+    data[~mask[rmin:rmax+1, cmin:cmax+1]] = no_data_value
 
     coords = tgp.npidxs_to_coords([(rmin, cmin)], src_raster.geo_transform)[0]
-    geo_transform = np.array(dst_raster.geo_transform)
+    geo_transform = np.array(src_raster.geo_transform)
     geo_transform[[0, 3]] = coords
-    dst_raster.geo_transform = geo_transform
+    dst_raster = tgp.Raster(data, geo_transform, src_raster.projection, None, src_raster.no_data_value, src_raster.metadata, copy=False)
 
     # src_ds = src_raster.to_gdal_ds()
     # temp_dir = tgp.create_temp_dir_when_not_exists()
@@ -1,11 +1,78 @@
 import os
+import itertools
+import threading
 import numpy as np
+from functools import lru_cache
+from collections import OrderedDict
 from osgeo import gdal
+from multiprocessing import shared_memory
+from numpy.lib.stride_tricks import as_strided
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pandas as pd
 import geopandas as gpd
 import TronGisPy as tgp
+import shapely
 from shapely.geometry import Polygon
 epsilon = 10**-6
 
+# the states of the worker processes of `SplittedImage.apply(backend='process')`
+_apply_worker_states = {}
+
+def _init_apply_worker(shm_name, shape, dtype, apply_fun, window_size, step_size, n_steps_w):
+    """Attach the padded image in shared memory in the worker process."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _apply_worker_states['shm'] = shm # keep the reference, or the buffer will be released
+    _apply_worker_states['padded_image'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _apply_worker_states['apply_fun'] = apply_fun
+    _apply_worker_states['window_size'] = window_size
+    _apply_worker_states['step_size'] = step_size
+    _apply_worker_states['n_steps_w'] = n_steps_w
+
+@lru_cache(maxsize=16)
+def get_blending_weights(blending, window_size_h, window_size_w):
+    """Get the (window_size_h, window_size_w) weights of the blending window used to 
+    combine the overlapped results. The weights are computed once for each blending 
+    and window size, and returned as a read-only array.
+
+    Parameters
+    ----------
+    blending: {'hann', 'gaussian', 'linear'}
+        'hann' is the cosine window, 'gaussian' is the gaussian window with sigma 
+        of 1/8 window size, and 'linear' is the triangular ramp. The weights on 
+        the edge are small but not zero.
+    window_size_h: int
+        The height of the window.
+    window_size_w: int
+        The width of the window.
+
+    Returns
+    -------
+    weights: ndarray
+        The weights with the maximum of 1 at the center of the window.
+    """
+    def get_weights_1d(n):
+        if blending == 'hann':
+            return np.hanning(n + 2)[1:-1]
+        elif blending == 'gaussian':
+            sigma = n / 8
+            return np.exp(-((np.arange(n) - (n - 1) / 2) ** 2) / (2 * sigma ** 2))
+        elif blending == 'linear':
+            return np.bartlett(n + 2)[1:-1]
+        else:
+            assert False, "blending should be 'hann', 'gaussian' or 'linear'"
+    weights = np.outer(get_weights_1d(window_size_h), get_weights_1d(window_size_w))
+    weights = weights / weights.max()
+    weights.flags.writeable = False
+    return weights
+
+def _apply_worker(idx):
+    """Apply the function to the splitted image of the order index in the worker process."""
+    (window_size_h, window_size_w), (step_size_h, step_size_w) = _apply_worker_states['window_size'], _apply_worker_states['step_size']
+    idx_h, idx_w = divmod(idx, _apply_worker_states['n_steps_w'])
+    h_start, w_start = idx_h * step_size_h, idx_w * step_size_w
+    splitted_img = _apply_worker_states['padded_image'][h_start:h_start+window_size_h, w_start:w_start+window_size_w].copy()
+    return _apply_worker_states['apply_fun'](splitted_img)
+
 class SplittedImage():
     """SplittedImage helps to splitting big remote sensing images into tiny 
     pieces for AI training purpose. SplittedImage supports not only images 
@@ -31,18 +98,75 @@ class SplittedImage():
     """
 
     def __init__(self, src_raster, box_size, step_size=None, pad_val=0):
-        """padding: ['right', 'left']"""
+        """padding: ['right', 'left']. box_size and step_size can be int or (h, w) tuple 
+        for rectangular splitted images."""
         self.src_raster = src_raster
-        self.src_image = src_raster.data
         self.src_gt = src_raster.geo_transform
         self.src_rows, self.src_cols, self.src_bands = src_raster.shape
         self.proj = src_raster.projection
         self.gdaldtype = src_raster.gdaldtype
         self.no_data_value = src_raster.no_data_value
 
-        self.window_size_h = self.window_size_w = box_size
-        self.step_size_h = self.step_size_w = step_size if step_size is not None else box_size
+        step_size = step_size if step_size is not None else box_size
+        self.window_size_h, self.window_size_w = (box_size, box_size) if np.ndim(box_size) == 0 else box_size
+        self.step_size_h, self.step_size_w = (step_size, step_size) if np.ndim(step_size) == 0 else step_size
+        assert (self.window_size_h > 0) and (self.window_size_w > 0), "box_size should be positive"
+        assert (self.step_size_h > 0) and (self.step_size_w > 0), "step_size should be positive"
         self.pad_val = pad_val
+        self.__padded_image = None
+        self.__valid_fractions = None
+        self.__block_cache = None
+
+    @classmethod
+    def from_file(cls, fp, box_size, step_size=None, pad_val=0, cache_blocks=256):
+        """Create SplittedImage backed by the raster file instead of the data in the 
+        memory. Each splitted image is read from the blocks of the file, which are 
+        kept in a LRU cache, and the splitted images on the edge are padded virtually. 
+        Only `padded_image`, `tiles_view` and `apply(backend='process')` read the whole 
+        image into the memory.
+
+        Parameters
+        ----------
+        fp: str
+            File path of the raster file. Tiled GeoTIFF is recommended.
+        box_size: int or tuple of int
+            The size (or (h, w) size) of the splitted images.
+        step_size: int or tuple of int, optional
+            The step (or (h, w) step) between the splitted images. If None, box_size is used.
+        pad_val: int or float, optional, default: 0
+            The value of the padded cells.
+        cache_blocks: int, optional, default: 256
+            The maximum number of blocks of the raster file kept in the cache.
+
+        Returns
+        -------
+        splitted_image: SplittedImage
+            The SplittedImage backed by the raster file.
+
+        Examples
+        --------
+        >>> import TronGisPy as tgp
+        >>> splitted_image = tgp.SplittedImage.from_file(tgp.get_testing_fp(), 254, step_size=127)
+        >>> idx, geo_transform, splitted_img = next(splitted_image.iter_tiles())
+        >>> splitted_img.shape
+        (254, 254, 3)
+        """
+        splitted_image = cls(tgp.open_raster(fp), box_size, step_size=step_size, pad_val=pad_val)
+        splitted_image.__block_cache = _BlockCache(fp, cache_blocks)
+        return splitted_image
+
+    @property
+    def src_image(self):
+        """The digital number of the source raster. If the SplittedImage is created by 
+        `SplittedImage.from_file`, the whole image will be read from the file."""
+        return self.src_raster.data
+
+    @property
+    def dtype(self):
+        """The dtype of the splitted images."""
+        if self.__block_cache is not None:
+            return self.__block_cache.dtype
+        return self.src_image.dtype
 
     def __repr__(self):
         desc = ""
@@ -87,9 +211,37 @@ class SplittedImage():
     @property
     def padded_image(self):
         """The padded image. The original image is padded 
-        in order to fit for splitting size."""
-        padded_image = np.pad(self.src_image, ((0, self.padded_rows-self.src_rows), (0, self.padded_cols-self.src_cols), (0,0)), 'constant', constant_values=self.pad_val)
-        return padded_image
+        in order to fit for splitting size. The padded image is 
+        created once and cached as a read-only array."""
+        if self.__padded_image is None:
+            padded_image = np.pad(self.src_image, ((0, self.padded_rows-self.src_rows), (0, self.padded_cols-self.src_cols), (0,0)), 'constant', constant_values=self.pad_val)
+            padded_image.flags.writeable = False
+            self.__padded_image = padded_image
+        return self.__padded_image
+
+    def tiles_view(self):
+        """Get all splitted images as a read-only view of the padded image 
+        without copying any splitted image.
+
+        Returns
+        -------
+        tiles: ndarray
+            The view in (n_steps_h, n_steps_w, window_size_h, window_size_w, bands) 
+            shape. `tiles[idx_h, idx_w]` is the splitted image of the location index.
+
+        Examples
+        --------
+        >>> import TronGisPy as tgp
+        >>> raster = tgp.read_raster(tgp.get_testing_fp())
+        >>> splitted_image = tgp.SplittedImage(raster, 254, step_size=127)
+        >>> splitted_image.tiles_view().shape
+        (5, 5, 254, 254, 3)
+        """
+        padded_image = self.padded_image
+        stride_h, stride_w, stride_b = padded_image.strides
+        shape = (self.n_steps_h, self.n_steps_w, self.window_size_h, self.window_size_w, self.src_bands)
+        strides = (stride_h * self.step_size_h, stride_w * self.step_size_w, stride_h, stride_w, stride_b)
+        return as_strided(padded_image, shape=shape, strides=strides, writeable=False)
 
     def __getitem__(self, slice_value):
         if type(slice_value) in [int, slice]:
@@ -102,9 +254,14 @@ class SplittedImage():
         h_start_inner, h_stop_inner = self.__convert_to_inner_index_h(h_start, h_stop)
         w_start_inner, w_stop_inner = self.__convert_to_inner_index_w(w_start, w_stop)
 
-        data = self.src_image[h_start_inner:h_stop_inner, w_start_inner:w_stop_inner]
         gt = np.array(self.src_gt).copy()
         gt[[0, 3]] = tgp.npidxs_to_coords([(h_start_inner, w_start_inner)], self.src_gt)[0]
+        if self.__block_cache is not None:
+            h_start_inner, w_start_inner = min(h_start_inner, self.src_rows), min(w_start_inner, self.src_cols)
+            h_stop_inner, w_stop_inner = min(h_stop_inner, self.src_rows), min(w_stop_inner, self.src_cols)
+            data = self.__block_cache.read_window(h_start_inner, w_start_inner, h_stop_inner-h_start_inner, w_stop_inner-w_start_inner)
+            return tgp.Raster(data, gt, self.proj, self.gdaldtype, self.no_data_value, copy=False)
+        data = self.src_image[h_start_inner:h_stop_inner, w_start_inner:w_stop_inner]
         raster = tgp.Raster(data, gt, self.proj, self.gdaldtype, self.no_data_value)
         return raster
 
@@ -189,57 +346,293 @@ class SplittedImage():
         idx_w = order_index % self.n_steps_w
         return (idx_h, idx_w)
 
-    def apply(self, apply_fun, return_raster=False, gdaldtype=None, no_data_value=None): # apply functino to all images:
+    def __get_tile(self, idx_h, idx_w):
+        """Get the splitted image of the location index from src_image (or from 
+        the block cache). Only the splitted images on the edge are padded with 
+        pad_val, others are views of src_image."""
+        h_start_inner, h_stop_inner = self.__convert_to_inner_index_h(idx_h, idx_h)
+        w_start_inner, w_stop_inner = self.__convert_to_inner_index_w(idx_w, idx_w)
+        if self.__block_cache is not None:
+            h_start_inner, w_start_inner = min(h_start_inner, self.src_rows), min(w_start_inner, self.src_cols)
+            h_stop_inner, w_stop_inner = min(h_stop_inner, self.src_rows), min(w_stop_inner, self.src_cols)
+            tile = self.__block_cache.read_window(h_start_inner, w_start_inner, h_stop_inner-h_start_inner, w_stop_inner-w_start_inner)
+        else:
+            tile = self.src_image[h_start_inner:h_stop_inner, w_start_inner:w_stop_inner]
+        pad_h, pad_w = self.window_size_h - tile.shape[0], self.window_size_w - tile.shape[1]
+        if (pad_h > 0) or (pad_w > 0):
+            tile = np.pad(tile, ((0, pad_h), (0, pad_w), (0, 0)), 'constant', constant_values=self.pad_val)
+        return tile
+
+    def __get_geo_transforms(self):
+        """Get geo_transforms of all splitted images in order index."""
+        idxs_h, idxs_w = np.divmod(np.arange(self.n_splitted_images), self.n_steps_w)
+        npidxs = np.stack([idxs_h * self.step_size_h, idxs_w * self.step_size_w], axis=1)
+        coords = tgp.npidxs_to_coords(npidxs, self.src_gt)
+        c, a, b, f, d, e = self.src_gt
+        return [(x_min, a, b, y_max, d, e) for x_min, y_max in coords]
+
+    def get_valid_fractions(self):
+        """Get the fraction of valid cells of all splitted images in order index. A cell 
+        is invalid if it is in the padded area, or all of its bands are no_data_value 
+        or np.nan. The valid cells of all splitted images are counted at once using 
+        the integral image (summed-area table) of the valid mask, and the result is cached. 
+        The image is scanned in row chunks and the integral image is only kept on the 
+        rows and columns of the splitted image boundaries, so the whole image is never 
+        held in the memory.
+
+        Returns
+        -------
+        valid_fractions: ndarray
+            The fraction of valid cells in (n_splitted_images,) shape.
+        """
+        if self.__valid_fractions is None:
+            idxs_h, idxs_w = np.divmod(np.arange(self.n_splitted_images), self.n_steps_w)
+            h_starts = np.minimum(idxs_h * self.step_size_h, self.src_rows)
+            w_starts = np.minimum(idxs_w * self.step_size_w, self.src_cols)
+            h_stops = np.minimum(h_starts + self.window_size_h, self.src_rows)
+            w_stops = np.minimum(w_starts + self.window_size_w, self.src_cols)
+
+            # integral_image[i, j] is the number of valid cells in [0, rows_needed[i]) x [0, cols_needed[j])
+            rows_needed, cols_needed = np.unique(np.concatenate([h_starts, h_stops])), np.unique(np.concatenate([w_starts, w_stops]))
+            integral_image = np.zeros((len(rows_needed), len(cols_needed)), dtype=np.int64)
+            integral_row = np.zeros(len(cols_needed), dtype=np.int64)
+            chunk_rows = max(1, 2**22 // max(self.src_cols, 1))
+            for row_st in range(0, self.src_rows, chunk_rows):
+                row_end = min(row_st + chunk_rows, self.src_rows)
+                is_valid = self.__get_valid_mask(row_st, row_end)
+                col_cumsum = np.zeros((row_end - row_st, self.src_cols + 1), dtype=np.int64)
+                np.cumsum(is_valid, axis=1, out=col_cumsum[:, 1:])
+                integral_rows = integral_row + np.cumsum(col_cumsum[:, cols_needed], axis=0) # for row_st+1 ~ row_end
+                is_row_needed = (rows_needed > row_st) & (rows_needed <= row_end)
+                integral_image[is_row_needed] = integral_rows[rows_needed[is_row_needed] - row_st - 1]
+                integral_row = integral_rows[-1]
+
+            h_starts, h_stops = np.searchsorted(rows_needed, h_starts), np.searchsorted(rows_needed, h_stops)
+            w_starts, w_stops = np.searchsorted(cols_needed, w_starts), np.searchsorted(cols_needed, w_stops)
+            n_valid = integral_image[h_stops, w_stops] - integral_image[h_starts, w_stops] - integral_image[h_stops, w_starts] + integral_image[h_starts, w_starts]
+            self.__valid_fractions = n_valid / (self.window_size_h * self.window_size_w)
+        return self.__valid_fractions
+
+    def __get_valid_mask(self, row_st, row_end):
+        """Get the mask of the valid cells from row_st to row_end."""
+        if self.__block_cache is not None:
+            data = self.__block_cache.read_window(row_st, 0, row_end - row_st, self.src_cols, cache=False)
+        else:
+            data = self.src_image[row_st:row_end]
+        is_invalid = np.ones(data.shape[:2], dtype=bool)
+        for b in range(data.shape[2]):
+            band = data[:, :, b]
+            is_invalid_band = np.isnan(band) if np.issubdtype(band.dtype, np.floating) else np.zeros(band.shape, dtype=bool)
+            if self.no_data_value is not None:
+                is_invalid_band |= (band == self.no_data_value)
+            is_invalid &= is_invalid_band
+        return ~is_invalid
+
+    def __get_kept_idxs(self, min_valid_fraction=None):
+        """Get the order indices of the splitted images whose valid fraction 
+        is not less than min_valid_fraction."""
+        if min_valid_fraction is None:
+            return list(range(self.n_splitted_images))
+        return np.where(self.get_valid_fractions() >= min_valid_fraction)[0].tolist()
+
+    def iter_tiles(self, batch_size=None, return_raster=False, min_valid_fraction=None):
+        """Iterate all splitted images lazily in order index, so only one splitted 
+        image (or one batch) is in the memory at a time.
+
+        Parameters
+        ----------
+        batch_size: int, optional
+            If None, yield splitted images one by one. Else, yield batches of 
+            splitted images with batch_size images (the last batch may be smaller).
+        return_raster: bool, optional, default: False
+            Yield Raster objects instead of ndarray.
+        min_valid_fraction: float, optional
+            Skip the splitted images whose fraction of valid cells is less than 
+            min_valid_fraction without extracting them. See also 
+            `SplittedImage.get_valid_fractions`.
+
+        Yields
+        ------
+        idx: int or list of int
+            The order index of the splitted image (or the batch).
+        geo_transform: tuple or list of tuple
+            The geo_transform of the splitted image (or the batch).
+        splitted_image: ndarray or Raster or list of Raster
+            The splitted image in (window_size_h, window_size_w, bands) shape. It is a 
+            view of the source image if the splitted image is not on the edge, so copy 
+            it before modifying it. If batch_size is set, the batch of ndarray is in 
+            (batch_size, window_size_h, window_size_w, bands) shape.
+
+        Examples
+        --------
+        >>> import TronGisPy as tgp
+        >>> raster = tgp.read_raster(tgp.get_testing_fp())
+        >>> splitted_image = tgp.SplittedImage(raster, 254, step_size=127)
+        >>> for idxs, geo_transforms, tiles in splitted_image.iter_tiles(batch_size=8):
+        ...     print(idxs[0], tiles.shape)
+        0 (8, 254, 254, 3)
+        8 (8, 254, 254, 3)
+        16 (8, 254, 254, 3)
+        24 (1, 254, 254, 3)
+        """
+        geo_transforms = self.__get_geo_transforms()
+        def get_item(idx):
+            tile = self.__get_tile(*self.convert_order_to_location_index(idx))
+            if return_raster:
+                return tgp.Raster(tile, geo_transforms[idx], self.proj, self.gdaldtype, self.no_data_value)
+            return tile
+
+        kept_idxs = self.__get_kept_idxs(min_valid_fraction)
+        if batch_size is None:
+            for idx in kept_idxs:
+                yield idx, geo_transforms[idx], get_item(idx)
+        else:
+            for idx_st in range(0, len(kept_idxs), batch_size):
+                idxs = kept_idxs[idx_st:idx_st + batch_size]
+                items = [get_item(idx) for idx in idxs]
+                yield idxs, [geo_transforms[idx] for idx in idxs], (items if return_raster else np.stack(items))
+
+    def apply(self, apply_fun, return_raster=False, gdaldtype=None, no_data_value=None, n_jobs=1, backend='thread', chunksize=1, min_valid_fraction=None): # apply functino to all images:
         """Apply a function to all splitted images.
 
         Parameters
         ----------
         apply_fun: function
             The function used to apply to all splitted images.
+        n_jobs: int, optional, default: 1
+            The number of workers to apply the function in parallel. -1 means using 
+            all processors. The results are always returned in order index.
+        backend: {'thread', 'process'}, optional, default: thread
+            'thread' fits the function releasing the GIL e.g. most numpy and cv2 
+            functions. 'process' puts the padded image into shared memory, so the 
+            splitted images are not pickled to the workers. apply_fun should be 
+            picklable (defined at the module level) when using 'process'.
+        chunksize: int, optional, default: 1
+            The number of splitted images sent to a worker at a time when using 'process'.
+        min_valid_fraction: float, optional
+            Skip the splitted images whose fraction of valid cells is less than 
+            min_valid_fraction. The results of the skipped splitted images are None.
 
         Returns
         -------
         return_objs: nparray
             splitted images that have applied the function.
         """
-        return_objs = []
-        padded_image = self.padded_image
-        geo_transforms = self.get_geo_attribute(True)['geo_transform']
-        for i in range(self.n_splitted_images):
-            idx_h , idx_w = self.convert_order_to_location_index(i)
-            h_start_inner, h_stop_inner = self.__convert_to_inner_index_h(idx_h, idx_h)
-            w_start_inner, w_stop_inner = self.__convert_to_inner_index_w(idx_w, idx_w)
-            splitted_img = padded_image[h_start_inner:h_stop_inner,w_start_inner:w_stop_inner].copy()
-            data = apply_fun(splitted_img)
+        assert backend in ['thread', 'process'], "backend should be 'thread' or 'process'"
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        kept_idxs = self.__get_kept_idxs(min_valid_fraction)
+        if n_jobs == 1:
+            results = (apply_fun(splitted_img.copy()) for i, gt, splitted_img in self.iter_tiles(min_valid_fraction=min_valid_fraction))
+            return self.__collect_apply_results(kept_idxs, results, return_raster, gdaldtype, no_data_value)
+        elif backend == 'thread':
+            get_tile = lambda idx: self.__get_tile(*self.convert_order_to_location_index(idx)).copy()
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                results = executor.map(lambda idx: apply_fun(get_tile(idx)), kept_idxs)
+                return self.__collect_apply_results(kept_idxs, results, return_raster, gdaldtype, no_data_value)
+        else:
+            padded_image = self.padded_image
+            shm = shared_memory.SharedMemory(create=True, size=max(padded_image.nbytes, 1))
+            try:
+                np.ndarray(padded_image.shape, dtype=padded_image.dtype, buffer=shm.buf)[:] = padded_image
+                initargs = (shm.name, padded_image.shape, padded_image.dtype, apply_fun, (self.window_size_h, self.window_size_w), (self.step_size_h, self.step_size_w), self.n_steps_w)
+                with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_apply_worker, initargs=initargs) as executor:
+                    results = executor.map(_apply_worker, kept_idxs, chunksize=chunksize)
+                    return self.__collect_apply_results(kept_idxs, results, return_raster, gdaldtype, no_data_value)
+            finally:
+                shm.close()
+                shm.unlink()
+
+    def apply_batched(self, apply_fun, batch_size=64, return_raster=False, gdaldtype=None, no_data_value=None, min_valid_fraction=None):
+        """Apply a function to batches of splitted images e.g. the predict function of 
+        a model. The next batch is prepared in a background thread while the current 
+        batch is processed.
+
+        Parameters
+        ----------
+        apply_fun: function
+            The function used to apply to the batches. The input is a C-contiguous 
+            array in (batch_size, window_size_h, window_size_w, bands) shape and the 
+            output should have one result for each splitted image in the batch.
+        batch_size: int, optional, default: 64
+            The number of splitted images in a batch.
+        min_valid_fraction: float, optional
+            Skip the splitted images whose fraction of valid cells is less than 
+            min_valid_fraction. The results of the skipped splitted images are None.
+
+        Returns
+        -------
+        return_objs: list
+            The results of all splitted images in order index.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import TronGisPy as tgp
+        >>> raster = tgp.read_raster(tgp.get_testing_fp())
+        >>> splitted_image = tgp.SplittedImage(raster, 254, step_size=127)
+        >>> means = splitted_image.apply_batched(lambda X: X.mean(axis=(1, 2, 3)), batch_size=8)
+        >>> len(means)
+        25
+        """
+        batches = self.iter_tiles(batch_size=batch_size, min_valid_fraction=min_valid_fraction)
+        results = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(next, batches, None)
+            while True:
+                batch = future.result()
+                if batch is None:
+                    break
+                future = executor.submit(next, batches, None) # prefetch the next batch
+                idxs, geo_transforms, splitted_imgs = batch
+                batch_results = apply_fun(splitted_imgs)
+                assert len(batch_results) == len(idxs), "apply_fun should return one result for each splitted image"
+                results.extend(batch_results)
+        return self.__collect_apply_results(self.__get_kept_idxs(min_valid_fraction), results, return_raster, gdaldtype, no_data_value)
+
+    def __collect_apply_results(self, idxs, results, return_raster=False, gdaldtype=None, no_data_value=None):
+        """Collect the results of `SplittedImage.apply` of the order indices in 
+        order index. The results of the skipped splitted images are None."""
+        return_objs = [None] * self.n_splitted_images
+        gdaldtype = self.gdaldtype if gdaldtype is None else gdaldtype
+        no_data_value = self.no_data_value if no_data_value is None else no_data_value
+        geo_transforms = self.__get_geo_transforms() if return_raster else None
+        for i, data in zip(idxs, results):
             if return_raster:
                 gt = geo_transforms[i]
-                pj = self.proj
-                gdaldtype = self.gdaldtype if gdaldtype is None else gdaldtype
-                no_data_value = self.no_data_value if no_data_value is None else no_data_value
-                raster = tgp.Raster(data, gt, pj, gdaldtype, no_data_value)
-                return_objs.append(raster)
+                raster = tgp.Raster(data, gt, self.proj, gdaldtype, no_data_value)
+                return_objs[i] = raster
             else:
-                return_objs.append(data)
+                return_objs[i] = data
         return return_objs
 
     def get_splitted_images(self, return_raster=False):
-        """Get all splitted images.
+        """Get all splitted images. Use `SplittedImage.iter_tiles` to iterate 
+        the splitted images without holding all of them in the memory.
 
         Returns
         -------
         splitted_images: ndarray
             All splitted images.
         """
-        return np.array(self.apply(lambda x:x, return_raster=return_raster))
+        if return_raster:
+            return np.array(self.apply(lambda x:x, return_raster=return_raster))
+        splitted_images = np.empty((self.n_splitted_images, self.window_size_h, self.window_size_w, self.src_bands), dtype=self.dtype)
+        for i, gt, splitted_img in self.iter_tiles():
+            splitted_images[i] = splitted_img
+        return splitted_images
         
-    def get_geo_attribute(self, return_geo_transform=False, crs=None):
-        """Get geo_attributes (idx, idx_h, idx_w, geo_transform, geometry) 
-        of all splitted images.
+    def get_geo_attribute(self, return_geo_transform=False, crs=None, return_valid_fraction=False):
+        """Get geo_attributes (idx, idx_h, idx_w, geo_transform, valid_fraction, 
+        geometry) of all splitted images.
 
         Parameters
         ----------
         return_geo_transform: bool, optional, default: False
             Return gdal geo_transform for each geometry in the output GeoDataFrame.
+        return_valid_fraction: bool, optional, default: False
+            Return the valid fraction (see `SplittedImage.get_valid_fractions`) of each 
+            splitted image in the output GeoDataFrame. The whole image will be scanned 
+            if the valid fractions are not calculated yet.
         crs: str, optional
             The crs for the output GeoDataFrame e.g. 'epsg:4326'.
 
@@ -248,32 +641,33 @@ class SplittedImage():
         df_attribute: gpd.GeoDataFrame
             The geo_attributes of all splitted images, which can be output as a shapefile.
         """
-        rows = []
-        for i in range(self.n_splitted_images):
-            idx_h , idx_w = self.convert_order_to_location_index(i)
-
-            h_start_inner, h_stop_inner = self.__convert_to_inner_index_h(idx_h, idx_h)
-            w_start_inner, w_stop_inner = self.__convert_to_inner_index_w(idx_w, idx_w)
-
-            left_top_coord = tgp.npidxs_to_coords([(h_start_inner, w_start_inner)], self.src_gt)[0]
-            left_buttom_coord = tgp.npidxs_to_coords([(h_start_inner, w_stop_inner)], self.src_gt)[0]
-            right_buttom_coord = tgp.npidxs_to_coords([(h_stop_inner, w_stop_inner)], self.src_gt)[0]
-            right_top_coord = tgp.npidxs_to_coords([(h_stop_inner, w_start_inner)], self.src_gt)[0]
-
-            x_min, y_max = left_top_coord
-            row = {
-                "idx":i,
-                "idx_h":idx_h,
-                "idx_w":idx_w,
-                "geo_transform":(x_min, self.src_gt[1], self.src_gt[2], y_max, self.src_gt[4], self.src_gt[5]),
-                "geometry": Polygon([left_top_coord, 
-                                    left_buttom_coord, 
-                                    right_buttom_coord, 
-                                    right_top_coord, 
-                                    left_top_coord]),
-            }
-            rows.append(row)
-        df_attribute = gpd.GeoDataFrame(rows, geometry='geometry')
+        idxs = np.arange(self.n_splitted_images)
+        idxs_h, idxs_w = np.divmod(idxs, self.n_steps_w)
+        h_starts_inner, w_starts_inner = idxs_h * self.step_size_h, idxs_w * self.step_size_w
+        h_stops_inner, w_stops_inner = h_starts_inner + self.window_size_h, w_starts_inner + self.window_size_w
+
+        # the four corners of all splitted images are converted at once
+        npidxs = np.stack([
+            np.stack([h_starts_inner, w_starts_inner], axis=1),
+            np.stack([h_starts_inner, w_stops_inner], axis=1),
+            np.stack([h_stops_inner, w_stops_inner], axis=1),
+            np.stack([h_stops_inner, w_starts_inner], axis=1),
+        ], axis=1) # (n_splitted_images, 4, 2)
+        coords = tgp.npidxs_to_coords(npidxs.reshape(-1, 2), self.src_gt).reshape(-1, 4, 2)
+        if hasattr(shapely, 'polygons'): # shapely>=2.0
+            geometry = shapely.polygons(coords)
+        else:
+            geometry = [Polygon(coord) for coord in coords]
+
+        c, a, b, f, d, e = self.src_gt
+        df_attribute = gpd.GeoDataFrame({
+            "idx":idxs,
+            "idx_h":idxs_h,
+            "idx_w":idxs_w,
+            "geo_transform":[(x_min, a, b, y_max, d, e) for x_min, y_max in coords[:, 0]],
+        }, geometry=geometry)
+        if return_valid_fraction:
+            df_attribute.insert(4, "valid_fraction", self.get_valid_fractions())
 
         if crs is not None:
             df_attribute.crs = crs
@@ -289,7 +683,7 @@ class SplittedImage():
         return df_attribute
 
 
-    def write_splitted_images(self, target_dir, filename, filter_fun=lambda x:True, idxs_to_be_kept=None):
+    def write_splitted_images(self, target_dir, filename, filter_fun=lambda x:True, idxs_to_be_kept=None, n_jobs=1, min_valid_fraction=None):
         """Write all splitted images as tif file.
 
         Parameters
@@ -301,33 +695,120 @@ class SplittedImage():
             the output filename you defined, e.g. <filename>_idx_idxh_idxw;.
         filter_fun: function, optional, default: lambda x:True
             Filter specific spllitted images and not save it. The input of the function is 
-            a splitted image. If the function output is True, the splitted image will be 
-            saved.
+            a splitted image (read-only). If the function output is True, the splitted image 
+            will be saved.
         idxs_to_be_kept: list, optional
-            list of indexs of splitted image to save as file.
+            list of indexs of splitted image to save as file. Other splitted images 
+            will not be extracted.
+        n_jobs: int, optional, default: 1
+            The number of threads to write the files. -1 means using all processors.
+        min_valid_fraction: float, optional
+            Skip the splitted images whose fraction of valid cells is less than 
+            min_valid_fraction without extracting them.
         """
-        df_attribute = self.get_geo_attribute(return_geo_transform=True)
-        splitted_images = self.get_splitted_images()
-        idxs_to_be_kept = range(len(df_attribute)) if idxs_to_be_kept is None else idxs_to_be_kept
-        for idx, row in df_attribute.iterrows():
-            if idx in idxs_to_be_kept:
-                target_img = splitted_images[idx].copy()
+        geo_transforms = self.__get_geo_transforms()
+        kept_idxs = self.__get_kept_idxs(min_valid_fraction)
+        idxs_to_be_kept = kept_idxs if idxs_to_be_kept is None else sorted(set(idxs_to_be_kept) & set(kept_idxs))
+        def write_splitted_image(idx):
+            idx_h, idx_w = self.convert_order_to_location_index(idx)
+            target_img = self.__get_tile(idx_h, idx_w)
+            target_img.flags.writeable = False
+            if filter_fun(target_img):
                 idx_str = "_" + ("%3i"%idx).replace(" ", "0")
-                idx_h_str = "_" + ("%3i"%row['idx_h']).replace(" ", "0")
-                idx_w_str = "_" + ("%3i"%row['idx_w']).replace(" ", "0")
+                idx_h_str = "_" + ("%3i"%idx_h).replace(" ", "0")
+                idx_w_str = "_" + ("%3i"%idx_w).replace(" ", "0")
                 path = os.path.join(target_dir, filename + idx_str + idx_h_str + idx_w_str + ".tif")
-                gt = row['geo_transform']
-                if filter_fun(target_img):
-                    tgp.write_raster(path, target_img, gt, self.proj, self.gdaldtype, self.no_data_value)
+                tgp.write_raster(path, target_img, geo_transforms[idx], self.proj, self.gdaldtype, self.no_data_value)
+
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        if n_jobs == 1:
+            for idx in idxs_to_be_kept:
+                write_splitted_image(idx)
+        else:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                list(executor.map(write_splitted_image, idxs_to_be_kept))
+
+    def export_tiles(self, path, format='npy_stack', chunks=None, compression='gzip', batch_size=64):
+        """Write all splitted images into one chunked array file in (n_splitted_images, 
+        window_size_h, window_size_w, bands) shape instead of one file for each splitted 
+        image. The splitted image of the order index can be accessed by `array[idx]`. 
+        A companion index csv file (`<path without extension>_index.csv`) with idx, 
+        idx_h, idx_w and geo_transform of each splitted image is written as well.
+
+        Parameters
+        ----------
+        path: str
+            The path of the output file (.npy for npy_stack, directory for zarr and 
+            .h5 for hdf5).
+        format: {'npy_stack', 'zarr', 'hdf5'}, optional, default: npy_stack
+            'npy_stack' is an uncompressed .npy file which can be memory-mapped by 
+            `np.load(path, mmap_mode='r')`. 'zarr' and 'hdf5' require the zarr and 
+            h5py packages respectively.
+        chunks: tuple of int, optional
+            The chunk shape for zarr and hdf5. If None, one splitted image per chunk 
+            i.e. (1, window_size_h, window_size_w, bands).
+        compression: str, optional, default: gzip
+            The compression filter for hdf5 e.g. 'gzip' or 'lzf'. None means no 
+            compression. zarr uses its default compressor.
+        batch_size: int, optional, default: 64
+            The number of splitted images written at a time.
+
+        Returns
+        -------
+        df_index: pd.DataFrame
+            The index of the splitted images.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import TronGisPy as tgp
+        >>> raster = tgp.read_raster(tgp.get_testing_fp())
+        >>> splitted_image = tgp.SplittedImage(raster, 254, step_size=127)
+        >>> df_index = splitted_image.export_tiles('tiles.npy', format='npy_stack')
+        >>> np.load('tiles.npy', mmap_mode='r')[3].shape
+        (254, 254, 3)
+        """
+        assert format in ['npy_stack', 'zarr', 'hdf5'], "format should be 'npy_stack', 'zarr' or 'hdf5'"
+        shape = (self.n_splitted_images, self.window_size_h, self.window_size_w, self.src_bands)
+        chunks = (1,) + shape[1:] if chunks is None else tuple(chunks)
+        h5_file = None
+        if format == 'npy_stack':
+            array = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=shape)
+        elif format == 'zarr':
+            import zarr
+            array = zarr.open(path, mode='w', shape=shape, chunks=chunks, dtype=self.dtype)
+        elif format == 'hdf5':
+            import h5py
+            h5_file = h5py.File(path, 'w')
+            array = h5_file.create_dataset('tiles', shape=shape, chunks=chunks, dtype=self.dtype, compression=compression)
+
+        try:
+            for idxs, geo_transforms, splitted_imgs in self.iter_tiles(batch_size=batch_size):
+                array[idxs[0]:idxs[-1]+1] = splitted_imgs
+        finally:
+            if format == 'npy_stack':
+                array.flush()
+            elif h5_file is not None:
+                h5_file.close()
 
-    def get_combined_image(self, X, padding=3, aggregator='mean'):
+        idxs = np.arange(self.n_splitted_images)
+        idxs_h, idxs_w = np.divmod(idxs, self.n_steps_w)
+        df_index = pd.DataFrame({'idx':idxs, 'idx_h':idxs_h, 'idx_w':idxs_w, 'geo_transform':self.__get_geo_transforms()})
+        df_index_csv = df_index.assign(geo_transform=[",".join([str(v) for v in gt]) for gt in df_index['geo_transform']])
+        df_index_csv.to_csv(os.path.splitext(path.rstrip(os.sep))[0] + '_index.csv', index=False)
+        return df_index
+
+    def get_combined_image(self, X, padding=3, aggregator='mean', dtype=np.float64, blending=None):
         """Combine the model predict result on all splitted images
 
         Parameters
         ----------
-        X: array_like
+        X: array_like or iterable
             The splitted image prediction result. should have the same shape with the 
-            SplittedImage.get_splitted_images.
+            SplittedImage.get_splitted_images. For mean, max and min aggregator, X can 
+            also be an iterable (e.g. generator) yielding the result of each splitted 
+            image in order index, which is combined one by one using `TileAccumulator`. 
+            None results (the skipped splitted images of `SplittedImage.apply`) are ignored.
         padding: int
             The number of pixel to remove the edge of each splitted image. Since 
             the segmentation model may not perform well on the edge of the image, 
@@ -336,6 +817,13 @@ class SplittedImage():
             The operator perform on the image pixel with multiple results. If 
             multuple predicting results are overlapped in the combined image, 
             aggregator is necessary to combine them into one band.
+        dtype: type, optional, default: np.float64
+            The dtype of the combined image for mean, max and min aggregator. Use 
+            np.float32 to halve the memory.
+        blending: {'hann', 'gaussian', 'linear'}, optional
+            Weight the results with the blending window (see also `get_blending_weights`) 
+            for mean aggregator, so the seams between the splitted images are feathered 
+            and less overlap is required.
 
         Returns
         -------
@@ -343,20 +831,29 @@ class SplittedImage():
             The combined image. The image will have the same geo-attribute (geo_transform 
             and projection) with the original image.
         """
-        if len(X.shape) == 3:
-            X = np.expand_dims(X, axis=3) 
+        if aggregator in ['mean', 'max', 'min']:
+            accumulator = TileAccumulator(self, padding=padding, aggregator=aggregator, dtype=dtype, blending=blending)
+            for i, X_i in enumerate(X):
+                accumulator.add(i, X_i)
+            return accumulator.get_combined_image()
+
+        assert blending is None, "blending is only supported by mean aggregator"
+        X = list(X) if not isinstance(X, np.ndarray) else X # keep the None results (skipped splitted images) in the list
+        X_valid = [X_i for X_i in X if X_i is not None]
+        assert len(X_valid) > 0, "all splitted images are skipped"
         rows, cols = self.src_rows, self.src_cols
-        bands = X.shape[3]
+        bands = 1 if len(np.shape(X_valid[0])) == 2 else np.shape(X_valid[0])[2]
         
         X_combined_bands = np.zeros((rows, cols, bands))
         for b in range(bands):
-            overlapped_count = np.max([
-                int(self.window_size_w/(self.step_size_w + epsilon)) + 1, 
-                int(self.window_size_h/(self.step_size_h + epsilon)) + 1
-                ])
+            overlapped_count = (int(self.window_size_h/(self.step_size_h + epsilon)) + 1) * (int(self.window_size_w/(self.step_size_w + epsilon)) + 1)
 
             X_combined_overlap = np.full((rows, cols, overlapped_count), np.nan)
             for i in range(len(X)):
+                if X[i] is None:
+                    continue
+                X_i = np.asarray(X[i])
+                X_i = X_i.reshape(X_i.shape[0], X_i.shape[1], -1)
                 idx_h , idx_w = self.convert_order_to_location_index(i)
                 h_start_inner, h_stop_inner = self.__convert_to_inner_index_h(idx_h, idx_h)
                 w_start_inner, w_stop_inner = self.__convert_to_inner_index_w(idx_w, idx_w)
@@ -367,29 +864,28 @@ class SplittedImage():
                 X_combined_inner = X_combined_overlap[h_start_inner:h_stop_inner, w_start_inner:w_stop_inner]
                 next_idx = np.argmax(np.isnan(X_combined_inner), axis=2).flatten() # find nan location (where to fill in) for each cell
                 img_idx_x, img_idx_y = np.where(np.ones_like(X_combined_inner[:,:,0]))
-                X_combined_inner[img_idx_x, img_idx_y, next_idx] = X[i, padding:padding+h_length, padding:padding+w_length, b].flatten()
+                X_combined_inner[img_idx_x, img_idx_y, next_idx] = X_i[padding:padding+h_length, padding:padding+w_length, b].flatten()
 
             X_combined = np.full((rows, cols), np.nan)
             row_idxs_not_na, col_idxs_not_na = np.where(~(np.sum(np.isnan(X_combined_overlap), axis=2) == overlapped_count)) # for filtering all nan cell
-            if aggregator=='mean': 
-                X_combined[row_idxs_not_na, col_idxs_not_na] = np.nanmean(X_combined_overlap[row_idxs_not_na, col_idxs_not_na], axis=1)
-            elif aggregator=='median': 
+            if aggregator=='median': 
                 X_combined[row_idxs_not_na, col_idxs_not_na] = np.nanmedian(X_combined_overlap[row_idxs_not_na, col_idxs_not_na], axis=1)
-            elif aggregator=='max': 
-                X_combined[row_idxs_not_na, col_idxs_not_na] = np.nanmax(X_combined_overlap[row_idxs_not_na, col_idxs_not_na], axis=1)
-            elif aggregator=='min': 
-                X_combined[row_idxs_not_na, col_idxs_not_na] = np.nanmin(X_combined_overlap[row_idxs_not_na, col_idxs_not_na], axis=1)
             X_combined_bands[:, :, b] = X_combined
         return X_combined_bands
 
-    def write_combined_tif(self, X, dst_tif_path, gdaldtype=None, no_data_value=None):
+    def write_combined_tif(self, X, dst_tif_path, gdaldtype=None, no_data_value=None, padding=3, aggregator='mean', creation_options=None, blending=None):
         """Combine the model predict result on splitted images and write as tif file.
+        For mean, max and min aggregator, the results are combined in a rolling 
+        buffer of window_size_h rows and the rows are written to the file as soon 
+        as no following splitted image can overlap them, so X can be a generator 
+        and the combined image is never held in the memory.
 
         Parameters
         ----------
-        X: array_like
+        X: array_like or iterable
             The splitted image prediction result. should have the same shape with the 
-            SplittedImage.get_splitted_images.
+            SplittedImage.get_splitted_images, or an iterable yielding the result of 
+            each splitted image in order index. None results are ignored.
         dst_tif_path: str
             The location to save the tif file.
         gdaldtype: int, optional
@@ -398,9 +894,284 @@ class SplittedImage():
             such as `gdal.GDT_Int32` equals 5 and `gdal.GDT_Float32` equals 6.
         no_data_value: int or float, optional
             Define which value to replace nan in numpy array when saving a raster file.
-            
+        padding: int, optional, default: 3
+            See also `SplittedImage.get_combined_image`.
+        aggregator: {"mean", "median", "max", "min"}, optional, default: mean
+            See also `SplittedImage.get_combined_image`.
+        creation_options: list or dict, optional
+            GTiff creation options e.g. ['TILED=YES', 'COMPRESS=DEFLATE', 'BIGTIFF=IF_SAFER']. 
+            See also `TronGisPy.RasterWriter`.
+        blending: {'hann', 'gaussian', 'linear'}, optional
+            See also `SplittedImage.get_combined_image`.
         """
-        X_combined_bands = self.get_combined_image(X)
         gdaldtype = gdaldtype if gdaldtype is not None else self.gdaldtype
         no_data_value = no_data_value if no_data_value is not None else self.no_data_value
-        tgp.write_raster(dst_tif_path, X_combined_bands, geo_transform=self.src_gt, projection=self.proj, gdaldtype=gdaldtype, no_data_value=no_data_value)
+        if aggregator == 'median':
+            X_combined_bands = self.get_combined_image(X, padding=padding, aggregator=aggregator, blending=blending)
+            if no_data_value is not None:
+                X_combined_bands[np.isnan(X_combined_bands)] = no_data_value
+            tgp.write_raster(dst_tif_path, X_combined_bands, geo_transform=self.src_gt, projection=self.proj, gdaldtype=gdaldtype, no_data_value=no_data_value, creation_options=creation_options)
+            return
+
+        # find the first result which is not skipped to know the number of bands
+        results, skipped_results, X_i = iter(X), [], None
+        for X_i in results:
+            if X_i is not None:
+                break
+            skipped_results.append(X_i)
+        assert X_i is not None, "all splitted images are skipped"
+        bands = 1 if len(np.shape(X_i)) == 2 else np.shape(X_i)[2]
+        results = itertools.chain(skipped_results, [X_i], results)
+
+        accumulator = TileAccumulator(self, padding=padding, aggregator=aggregator, dtype=np.float64, buffer_rows=self.window_size_h, blending=blending, bands=bands)
+        writer = tgp.RasterWriter(dst_tif_path, self.src_rows, self.src_cols, bands, gdaldtype, self.src_gt, self.proj, no_data_value, creation_options=creation_options)
+        def write_rows(row_stop):
+            while accumulator.row_off < row_stop:
+                row_off, X_rows = accumulator.pop_rows(min(accumulator.row_off + accumulator.buffer_rows, row_stop))
+                if no_data_value is not None:
+                    X_rows[np.isnan(X_rows)] = no_data_value
+                writer.write_window(X_rows, (row_off, 0))
+
+        try:
+            for i, X_i in enumerate(results):
+                idx_h, idx_w = self.convert_order_to_location_index(i)
+                if (idx_w == 0) and (idx_h > 0): # the rows above the new row of splitted images are finished
+                    write_rows(min(idx_h * self.step_size_h + padding, self.src_rows))
+                accumulator.add(i, X_i)
+            write_rows(self.src_rows)
+        finally:
+            writer.close()
+
+class _BlockCache():
+    """LRU cache of the blocks of the raster file for `SplittedImage.from_file`."""
+
+    def __init__(self, fp, max_blocks=256):
+        self.fp = fp
+        self.ds = gdal.Open(fp)
+        assert self.ds is not None, "cannot open the raster file: " + str(fp)
+        self.rows, self.cols, self.bands = self.ds.RasterYSize, self.ds.RasterXSize, self.ds.RasterCount
+        self.block_cols, self.block_rows = self.ds.GetRasterBand(1).GetBlockSize()
+        self.dtype = np.dtype(tgp.gdaldtype_to_npdtype(self.ds.GetRasterBand(1).DataType))
+        self.max_blocks = max_blocks
+        self.blocks = OrderedDict()
+        self.lock = threading.Lock() # gdal DataSource should not be read by multiple threads at the same time
+
+    def __read_ds_window(self, row_off, col_off, rows, cols):
+        with self.lock:
+            return tgp.read_gdal_ds(self.ds, window=(row_off, col_off, rows, cols)).data
+
+    def __get_block(self, block_h, block_w):
+        key = (block_h, block_w)
+        with self.lock:
+            if key in self.blocks:
+                self.blocks.move_to_end(key)
+                return self.blocks[key]
+        row_off, col_off = block_h * self.block_rows, block_w * self.block_cols
+        block = self.__read_ds_window(row_off, col_off, min(self.block_rows, self.rows-row_off), min(self.block_cols, self.cols-col_off))
+        with self.lock:
+            self.blocks[key] = block
+            while len(self.blocks) > self.max_blocks:
+                self.blocks.popitem(last=False)
+        return block
+
+    def read_window(self, row_off, col_off, rows, cols, cache=True):
+        """Read the (row_off, col_off, rows, cols) window from the cached blocks. If 
+        cache is False, read the window from the file directly."""
+        if (rows == 0) or (cols == 0): # e.g. the splitted image outside the raster when step_size > box_size
+            return np.empty((rows, cols, self.bands), dtype=self.dtype)
+        if not cache:
+            return self.__read_ds_window(row_off, col_off, rows, cols)
+        data = None
+        for block_h in range(row_off // self.block_rows, (row_off + rows - 1) // self.block_rows + 1):
+            for block_w in range(col_off // self.block_cols, (col_off + cols - 1) // self.block_cols + 1):
+                block = self.__get_block(block_h, block_w)
+                if data is None:
+                    data = np.empty((rows, cols, block.shape[2]), dtype=block.dtype)
+                block_row_off, block_col_off = block_h * self.block_rows, block_w * self.block_cols
+                row_st, row_end = max(row_off, block_row_off), min(row_off + rows, block_row_off + block.shape[0])
+                col_st, col_end = max(col_off, block_col_off), min(col_off + cols, block_col_off + block.shape[1])
+                data[row_st-row_off:row_end-row_off, col_st-col_off:col_end-col_off] = block[row_st-block_row_off:row_end-block_row_off, col_st-block_col_off:col_end-block_col_off]
+        return data
+
+class TileAccumulator():
+    """TileAccumulator combines the predicted results on the splitted images into 
+    one image tile by tile, so the results can be fed from a generator without 
+    holding all of them in the memory. For `mean` aggregator, the running sum 
+    and count (or the sum of the blending weights) of each cell are kept. For `max` 
+    and `min` aggregator, the running maximum or minimum of each cell is kept. 
+    np.nan in the results is ignored.
+    The running values can be kept for only `buffer_rows` rows; the finished 
+    rows are popped by `TileAccumulator.pop_rows` to free the buffer.
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp
+    >>> raster = tgp.read_raster(tgp.get_testing_fp())
+    >>> splitted_image = tgp.SplittedImage(raster, 254, step_size=127)
+    >>> accumulator = tgp.TileAccumulator(splitted_image, padding=3, aggregator='mean')
+    >>> for idx, geo_transform, splitted_img in splitted_image.iter_tiles():
+    ...     accumulator.add(idx, splitted_img[:, :, 0])
+    >>> accumulator.get_combined_image().shape
+    (677, 674, 1)
+    """
+
+    def __init__(self, splitted_image, padding=3, aggregator='mean', dtype=np.float32, buffer_rows=None, blending=None, bands=None):
+        """Initializing TileAccumulator object.
+
+        Parameters
+        ----------
+        splitted_image: SplittedImage
+            The SplittedImage the results are predicted on.
+        padding: int, optional, default: 3
+            The number of pixel to remove the edge of each splitted image. See 
+            also `SplittedImage.get_combined_image`.
+        aggregator: {"mean", "max", "min"}, optional, default: mean
+            The operator perform on the image pixel with multiple results.
+        dtype: type, optional, default: np.float32
+            The dtype of the running values and the combined image.
+        buffer_rows: int, optional
+            The number of rows of the running values starting from `row_off`. If 
+            None, the running values cover the whole image.
+        blending: {'hann', 'gaussian', 'linear'}, optional
+            Weight the results with the blending window for mean aggregator. See also 
+            `TronGisPy.SplittedImage.get_blending_weights`.
+        bands: int, optional
+            Number of bands of the results. If None, the running values are allocated 
+            when the first result is added.
+        """
+        assert aggregator in ['mean', 'max', 'min'], "aggregator should be 'mean', 'max' or 'min'"
+        assert (blending is None) or (aggregator == 'mean'), "blending is only supported by mean aggregator"
+        self.splitted_image = splitted_image
+        self.padding = padding
+        self.aggregator = aggregator
+        self.dtype = dtype
+        self.buffer_rows = splitted_image.src_rows if buffer_rows is None else min(buffer_rows, splitted_image.src_rows)
+        self.weights = None if blending is None else get_blending_weights(blending, splitted_image.window_size_h, splitted_image.window_size_w)
+        self.row_off = 0 # the first row of the image kept in the running values
+        self.values = None # the running sum, maximum or minimum, allocated when the first result is added
+        self.counts = None
+        if bands is not None:
+            self.__allocate(bands)
+
+    @property
+    def bands(self):
+        """Number of bands of the results. None if no result has been added."""
+        return self.values.shape[2] if self.values is not None else None
+
+    def get_window(self, idx):
+        """Get (h_start, h_stop, w_start, w_stop) of the result of the splitted 
+        image in the combined image after removing the padding."""
+        splitted_image = self.splitted_image
+        idx_h, idx_w = splitted_image.convert_order_to_location_index(idx)
+        h_start = idx_h * splitted_image.step_size_h + self.padding
+        w_start = idx_w * splitted_image.step_size_w + self.padding
+        h_stop = min(idx_h * splitted_image.step_size_h + splitted_image.window_size_h - self.padding, splitted_image.src_rows)
+        w_stop = min(idx_w * splitted_image.step_size_w + splitted_image.window_size_w - self.padding, splitted_image.src_cols)
+        return h_start, max(h_stop, h_start), w_start, max(w_stop, w_start)
+
+    def __reset(self, values, counts):
+        """Reset the running values to the initial values."""
+        values[:] = 0 if self.aggregator == 'mean' else np.nan
+        if counts is not None:
+            counts[:] = 0
+
+    def __allocate(self, bands):
+        """Allocate the running values."""
+        shape = (self.buffer_rows, self.splitted_image.src_cols, bands)
+        self.values = np.empty(shape, dtype=self.dtype)
+        self.counts = np.empty(shape, dtype=self.dtype) if self.aggregator == 'mean' else None
+        self.__reset(self.values, self.counts)
+
+    def add(self, idx, X_i):
+        """Add the predicted result of the splitted image.
+
+        Parameters
+        ----------
+        idx: int
+            The order index of the splitted image.
+        X_i: ndarray or None
+            The predicted result in (window_size_h, window_size_w) or 
+            (window_size_h, window_size_w, bands) shape. None (the result of the 
+            skipped splitted image) is ignored.
+        """
+        if X_i is None:
+            return
+        X_i = np.asarray(X_i)
+        if len(X_i.shape) == 2:
+            X_i = np.expand_dims(X_i, axis=2)
+        if self.values is None:
+            self.__allocate(X_i.shape[2])
+
+        h_start, h_stop, w_start, w_stop = self.get_window(idx)
+        if (h_start == h_stop) or (w_start == w_stop):
+            return
+        assert (h_start >= self.row_off) and (h_stop <= self.row_off + self.buffer_rows), "the result is out of the buffer, pop the finished rows first"
+        X_i = X_i[self.padding:self.padding+(h_stop-h_start), self.padding:self.padding+(w_stop-w_start)].astype(self.dtype, copy=False)
+        values = self.values[h_start-self.row_off:h_stop-self.row_off, w_start:w_stop]
+        if self.aggregator == 'mean':
+            is_valid = ~np.isnan(X_i)
+            if self.weights is None:
+                values += np.where(is_valid, X_i, 0)
+                self.counts[h_start-self.row_off:h_stop-self.row_off, w_start:w_stop] += is_valid
+            else:
+                weights = np.expand_dims(self.weights[self.padding:self.padding+(h_stop-h_start), self.padding:self.padding+(w_stop-w_start)], axis=2)
+                values += np.where(is_valid, X_i * weights, 0)
+                self.counts[h_start-self.row_off:h_stop-self.row_off, w_start:w_stop] += is_valid * weights
+        elif self.aggregator == 'max':
+            np.fmax(values, X_i, out=values)
+        elif self.aggregator == 'min':
+            np.fmin(values, X_i, out=values)
+
+    def __get_combined_values(self, values, counts):
+        """Convert the running values into the combined values in place."""
+        if self.aggregator == 'mean':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.divide(values, counts, out=values) # 0/0 => nan
+        return values
+
+    def pop_rows(self, row_stop):
+        """Pop the combined rows from `row_off` to row_stop, which should not be 
+        overlapped by the results added afterwards, and move the buffer down.
+
+        Parameters
+        ----------
+        row_stop: int
+            The row (exclusive) to pop to.
+
+        Returns
+        -------
+        row_off: int
+            The first row of the popped rows in the combined image.
+        X_rows: ndarray
+            The combined rows in (row_stop - row_off, cols, bands) shape.
+        """
+        assert self.values is not None, "no result has been added"
+        row_off, n_rows = self.row_off, row_stop - self.row_off
+        assert 0 <= n_rows <= self.buffer_rows, "row_stop should be in the buffer"
+        counts = self.counts[:n_rows] if self.counts is not None else None
+        X_rows = self.__get_combined_values(self.values[:n_rows].copy(), counts)
+
+        n_rows_kept, counts_to_reset = self.buffer_rows - n_rows, None
+        self.values[:n_rows_kept] = self.values[n_rows:]
+        if self.counts is not None:
+            self.counts[:n_rows_kept] = self.counts[n_rows:]
+            counts_to_reset = self.counts[n_rows_kept:]
+        self.__reset(self.values[n_rows_kept:], counts_to_reset)
+        self.row_off = row_stop
+        return row_off, X_rows
+
+    def get_combined_image(self):
+        """Get the combined image. The cells without any result are np.nan. The 
+        running values are reused for the combined image, so the accumulator is 
+        emptied afterwards.
+
+        Returns
+        -------
+        X_combined: ndarray
+            The combined image in (rows, cols, bands) shape.
+        """
+        assert self.values is not None, "no result has been added"
+        assert (self.row_off == 0) and (self.buffer_rows == self.splitted_image.src_rows), "the buffer should cover the whole image, use TileAccumulator.pop_rows instead"
+        X_combined = self.__get_combined_values(self.values, self.counts)
+        self.values, self.counts = None, None
+        return X_combined
@@ -1,10 +1,13 @@
 from TronGisPy.Raster import Raster
+from TronGisPy.RasterWriter import RasterWriter
 from TronGisPy.Normalizer import Normalizer
-from TronGisPy.SplittedImage import SplittedImage
+from TronGisPy.SplittedImage import SplittedImage, TileAccumulator
 
 from TronGisPy.io import remove_shp, create_temp_dir_when_not_exists
-from TronGisPy.io import get_raster_info, get_raster_data, get_raster_extent, update_raster_info
-from TronGisPy.io import read_raster, write_raster, read_gdal_ds, write_gdal_ds, get_testing_fp
+from TronGisPy.io import get_raster_info, get_raster_data, get_raster_extent, update_raster_info, scan_rasters
+from TronGisPy.io import get_window_by_extent, get_window_geo_transform
+from TronGisPy.io import read_raster, open_raster, write_raster, read_gdal_ds, write_gdal_ds, get_testing_fp
+from TronGisPy.io import iter_blocks, write_cog, get_overview_levels
 
 from TronGisPy.CRS import epsg_to_wkt, wkt_to_epsg, get_extent
 from TronGisPy.CRS import coords_to_npidxs, npidxs_to_coords, npidxs_to_coord_polygons
@@ -1,10 +1,12 @@
 import os
 import time
 import shutil
+import pickle
 import numpy as np
 from osgeo import gdal
 import TronGisPy as tgp
 from TronGisPy import ShapeGrid
+from TronGisPy.RasterWriter import get_creation_options, write_ds_window
 
 # operation on raster files
 # ===========================
@@ -52,13 +54,26 @@ def get_raster_info(fp, attributes=["rows", "cols", "bands", "geo_transform", "p
         attributes_idx = default_attributes.index(attributes)
         return geo_info[attributes_idx]
 
-def get_raster_data(fp):
+def get_raster_data(fp, window=None, bands=None, out_shape=None, overview_level=None, resample_alg='near'):
     """Get the digital number of the raster file.
 
     Parameters
     ----------
     fp: str
         File path of the raster file.
+    window: tuple of int, optional
+        Only read the cells in (row_off, col_off, rows, cols) window. If None, 
+        read the whole raster.
+    bands: list of int, optional
+        Which bands to read (start from 0). If None, read all bands.
+    out_shape: tuple of int, optional
+        Read the window into (rows, cols) shape. The existing overviews will be used by 
+        gdal if the resolution is reduced, otherwise the data will be decimated while reading.
+    overview_level: int, optional
+        Read the window from the overview of the level (start from 0). Should not 
+        be set with out_shape at the same time.
+    resample_alg: {'near', 'bilinear', 'cubic', 'cubicspline', 'lanczos', 'average', 'mode', 'gauss'}, optional, default: near
+        The resampling algorithm when out_shape or overview_level is set.
 
     Returns
     -------
@@ -74,13 +89,126 @@ def get_raster_data(fp):
     <class 'numpy.ndarray'>
     >>> data.shape 
     (677, 674, 3)
+    >>> tgp.get_raster_data(raster_fp, window=(100, 200, 50, 60), bands=[0]).shape
+    (50, 60, 1)
+    >>> tgp.get_raster_data(raster_fp, out_shape=(67, 67)).shape
+    (67, 67, 3)
     """
     ds = gdal.Open(fp)
-    data = ds.ReadAsArray()
+    out_shape = __get_out_shape(ds, window, out_shape, overview_level)
+    data = __read_ds_data(ds, window=window, bands=bands, out_shape=out_shape, resample_alg=resample_alg)
     ds = None 
+    return data
+
+def __check_window(ds, window):
+    """validate (row_off, col_off, rows, cols) window, return the whole raster if window is None"""
+    if window is None:
+        return (0, 0, ds.RasterYSize, ds.RasterXSize)
+    assert len(window) == 4, "window should be (row_off, col_off, rows, cols)"
+    row_off, col_off, rows, cols = [int(w) for w in window]
+    assert (row_off >= 0) and (col_off >= 0) and (rows > 0) and (cols > 0), "window should be inside the raster and not empty"
+    assert (row_off + rows <= ds.RasterYSize) and (col_off + cols <= ds.RasterXSize), "window should be inside the raster and not empty"
+    return (row_off, col_off, rows, cols)
+
+__resample_algs = {
+    'near': gdal.GRIORA_NearestNeighbour, 
+    'bilinear': gdal.GRIORA_Bilinear, 
+    'cubic': gdal.GRIORA_Cubic, 
+    'cubicspline': gdal.GRIORA_CubicSpline, 
+    'lanczos': gdal.GRIORA_Lanczos, 
+    'average': gdal.GRIORA_Average, 
+    'mode': gdal.GRIORA_Mode, 
+    'gauss': gdal.GRIORA_Gauss,
+}
+
+def __get_out_shape(ds, window, out_shape, overview_level):
+    """convert overview_level into the (rows, cols) shape of the window on the overview"""
+    if overview_level is None:
+        return out_shape
+    assert out_shape is None, "should not set out_shape and overview_level at the same time!"
+    n_overviews = ds.GetRasterBand(1).GetOverviewCount()
+    assert 0 <= overview_level < n_overviews, "overview_level should be in range(0, {})".format(n_overviews)
+    overview = ds.GetRasterBand(1).GetOverview(overview_level)
+    row_off, col_off, rows, cols = __check_window(ds, window)
+    out_rows = max(int(round(rows * overview.YSize / ds.RasterYSize)), 1)
+    out_cols = max(int(round(cols * overview.XSize / ds.RasterXSize)), 1)
+    return (out_rows, out_cols)
+
+def __read_ds_data(ds, window=None, bands=None, out_shape=None, resample_alg='near'):
+    """read the window of the bands into a C-contiguous (rows, cols, bands) array using 
+    pixel-interleaved buffer, so no transpose (copy) is required after reading"""
+    row_off, col_off, rows, cols = __check_window(ds, window)
+    bands = list(range(ds.RasterCount)) if bands is None else list(bands)
+    assert all([0 <= b < ds.RasterCount for b in bands]), "bands should be in range(0, {})".format(ds.RasterCount)
+    out_rows, out_cols = (rows, cols) if out_shape is None else out_shape
+    assert resample_alg in __resample_algs, "resample_alg should be in " + str(list(__resample_algs.keys()))
+    data = ds.ReadAsArray(col_off, row_off, cols, rows, buf_xsize=out_cols, buf_ysize=out_rows, resample_alg=__resample_algs[resample_alg], 
+                          band_list=[b+1 for b in bands], interleave='pixel')
     if len(data.shape) == 2:
-        data = np.expand_dims(data, axis=0)
-    return np.transpose(data, axes=[1,2,0])
+        data = np.expand_dims(data, axis=2)
+    return data
+
+def get_window_by_extent(rows, cols, geo_transform, extent):
+    """Get the (row_off, col_off, rows, cols) window of the raster covering the extent.
+
+    Parameters
+    ----------
+    rows: int
+        The number of rows in the raster.
+    cols: int
+        The number of cols in the raster.
+    geo_transform: tuple or list
+        Affine transform parameters (c, a, b, f, d, e = geo_transform).
+    extent: tuple
+        Extent with (xmin, ymin, xmax, ymax) format.
+
+    Returns
+    -------
+    window: tuple of int
+        (row_off, col_off, rows, cols) of the cells covering the extent. The window
+        is clipped by the boundary of the raster.
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp
+    >>> rows, cols, geo_transform = tgp.get_raster_info(tgp.get_testing_fp(), ['rows', 'cols', 'geo_transform'])
+    >>> tgp.get_window_by_extent(rows, cols, geo_transform, (272000, 2769500, 272100, 2769600))
+    (333, 15, 90, 90)
+    """
+    xmin, ymin, xmax, ymax = extent
+    inv_geo_transform = gdal.InvGeoTransform(geo_transform)
+    corners = [(xmin, ymin), (xmin, ymax), (xmax, ymax), (xmax, ymin)]
+    col_idxs, row_idxs = np.array([gdal.ApplyGeoTransform(inv_geo_transform, x, y) for x, y in corners]).T
+    row_st, row_end = max(int(np.floor(row_idxs.min())), 0), min(int(np.ceil(row_idxs.max())), rows)
+    col_st, col_end = max(int(np.floor(col_idxs.min())), 0), min(int(np.ceil(col_idxs.max())), cols)
+    assert (row_end > row_st) and (col_end > col_st), "extent does not overlap with the raster"
+    return (row_st, col_st, row_end - row_st, col_end - col_st)
+
+def get_window_geo_transform(geo_transform, window, out_shape=None):
+    """Get the geo_transform of the (row_off, col_off, rows, cols) window of the raster.
+
+    Parameters
+    ----------
+    geo_transform: tuple or list
+        Affine transform parameters (c, a, b, f, d, e = geo_transform) of the raster.
+    window: tuple of int
+        (row_off, col_off, rows, cols) window of the raster.
+    out_shape: tuple of int, optional
+        The (rows, cols) shape the window is resampled to. The pixel size will be 
+        scaled accordingly.
+
+    Returns
+    -------
+    geo_transform: tuple
+        Affine transform parameters whose origin is shifted to the left-top corner of the window.
+    """
+    row_off, col_off = window[0], window[1]
+    window_geo_transform = np.array(geo_transform, dtype=np.float64)
+    window_geo_transform[[0, 3]] = tgp.npidxs_to_coords([(row_off, col_off)], geo_transform)[0]
+    if out_shape is not None:
+        window_geo_transform[[1, 4]] *= window[3] / out_shape[1] # a, d scale with cols
+        window_geo_transform[[2, 5]] *= window[2] / out_shape[0] # b, e scale with rows
+    return tuple(window_geo_transform.tolist())
 
 def get_raster_extent(fp, return_type='poly'):
     """Get the boundary of the raster file.
@@ -109,6 +237,84 @@ def get_raster_extent(fp, return_type='poly'):
     rows, cols, geo_transform = get_raster_info(fp, ['rows', 'cols', 'geo_transform'])
     return tgp.get_extent(rows, cols, geo_transform, return_type)
 
+def __scan_raster(fp):
+    """Read the geo-information of the raster file for `scan_rasters` with only one 
+    gdal.Open. The values are None if the file cannot be opened."""
+    ds = gdal.Open(fp)
+    if ds is None:
+        return [None] * 8
+    rows, cols, bands = ds.RasterYSize, ds.RasterXSize, ds.RasterCount
+    geo_transform, projection = ds.GetGeoTransform(), ds.GetProjection()
+    gdaldtype = ds.GetRasterBand(1).DataType
+    no_data_value = ds.GetRasterBand(1).GetNoDataValue()
+    ds = None
+    extent = tgp.get_extent(rows, cols, geo_transform, return_type='poly')
+    return [rows, cols, bands, geo_transform, projection, gdaldtype, no_data_value, extent]
+
+def scan_rasters(fps, workers=None, cache_fp=None):
+    """Get the geo-information of many raster files in parallel threads.
+
+    Parameters
+    ----------
+    fps: list of str
+        File paths of the raster files.
+    workers: int, optional
+        The number of threads to open the files. If None, the default of 
+        `concurrent.futures.ThreadPoolExecutor` is used.
+    cache_fp: str, optional
+        File path of the pickle file to cache the geo-information. The cache is 
+        keyed by (fp, mtime, size), so only new or modified files are opened 
+        again when scanning the same archive. The paths which are not local files 
+        (e.g. /vsi paths and urls) and the files which cannot be opened are not 
+        cached and will be scanned every time.
+
+    Returns
+    -------
+    df_rasters: geopandas.GeoDataFrame
+        One row for each file with fp, rows, cols, bands, geo_transform, projection, 
+        gdaldtype, no_data_value columns and the extent polygon as geometry. The 
+        values are None if the file cannot be opened.
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp 
+    >>> df_rasters = tgp.scan_rasters([tgp.get_testing_fp('satellite_tif')], workers=2)
+    >>> df_rasters[['rows', 'cols', 'bands']].values.tolist()
+    [[512, 512, 4]]
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import geopandas as gpd
+    from shapely.geometry import Polygon
+
+    cache = {}
+    if (cache_fp is not None) and os.path.isfile(cache_fp):
+        with open(cache_fp, 'rb') as f:
+            cache = pickle.load(f)
+
+    keys = []
+    for fp in fps:
+        stat = os.stat(fp) if os.path.isfile(fp) else None
+        keys.append((fp, stat.st_mtime, stat.st_size) if stat is not None else (fp, None, None))
+    is_cachable = lambda key, info: (key[1] is not None) and (info[0] is not None) # only cache the local files opened successfully
+    infos = {key:cache[key] for key in set(keys) if (key in cache) and is_cachable(key, cache[key])}
+    keys_to_scan = [key for key in set(keys) if key not in infos]
+    n_cached = len(cache)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for key, info in zip(keys_to_scan, executor.map(__scan_raster, [key[0] for key in keys_to_scan])):
+            infos[key] = info
+            if is_cachable(key, info):
+                cache[key] = info
+
+    if (cache_fp is not None) and (len(cache) > n_cached):
+        with open(cache_fp, 'wb') as f:
+            pickle.dump(cache, f)
+
+    columns = ['rows', 'cols', 'bands', 'geo_transform', 'projection', 'gdaldtype', 'no_data_value']
+    records = [[key[0]] + infos[key][:7] for key in keys]
+    geometry = [Polygon(infos[key][7]) if infos[key][7] is not None else None for key in keys]
+    df_rasters = gpd.GeoDataFrame(records, columns=['fp'] + columns, geometry=geometry)
+    return df_rasters
+
 def update_raster_info(fp, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None):
     """Update the geo-information of the raster file including geo_transform, projection, gdaldtype, 
     no_data_value, metadata attributes.
@@ -150,13 +356,39 @@ def update_raster_info(fp, geo_transform=None, projection=None, gdaldtype=None,
 
 # operation on Raster class
 # ===========================
-def read_raster(fp, fill_na=False):
+def read_raster(fp, fill_na=False, window=None, bands=None, extent=None, out_shape=None, overview_level=None, resample_alg='near', mmap=False):
     """Read raster file as `TronGisPy.Raster` object.
 
     Parameters
     ----------
     fp: str 
         File path of the raster file.
+    fill_na: bool, optional, default: False
+        Fill np.nan with no_data_value of the raster file.
+    window: tuple of int, optional
+        Only read the cells in (row_off, col_off, rows, cols) window. The 
+        geo_transform of the output raster will be shifted to the window.
+    bands: list of int, optional
+        Which bands to read (start from 0). If None, read all bands.
+    extent: tuple, optional
+        Only read the cells covering the (xmin, ymin, xmax, ymax) extent. Should 
+        not be set with window at the same time.
+    out_shape: tuple of int, optional
+        Read the window into (rows, cols) shape. The existing overviews will be used by 
+        gdal if the resolution is reduced. The geo_transform will be scaled accordingly.
+    overview_level: int, optional
+        Read the window from the overview of the level (start from 0). Should not 
+        be set with out_shape at the same time.
+    resample_alg: {'near', 'bilinear', 'cubic', 'cubicspline', 'lanczos', 'average', 'mode', 'gauss'}, optional, default: near
+        The resampling algorithm when out_shape or overview_level is set.
+    mmap: bool or {'r+', 'r', 'c'}, optional, default: False
+        Memory-map the pixel bytes of the file as `numpy.memmap` instead of reading 
+        them. Only uncompressed, striped GeoTIFF with contiguous strips and ENVI/EHdr 
+        raw files (.bsq, .bil, .bip) in native byte order are supported. If True, 
+        'r+' mode is used when the file is writable so that assignments to `Raster.data` 
+        are written back to the file, otherwise 'r' (read-only) is used. 'c' means 
+        copy-on-write. Should not be set with window, bands, extent, out_shape or 
+        overview_level.
 
     Returns
     -------
@@ -175,16 +407,170 @@ def read_raster(fp, fill_na=False):
     projection: PROJCS["TWD97 / TM2 zone 121",GEOGCS["TWD97",DATUM["Taiwan_Datum_1997",SPHEROID["GRS 1980",6378137,298.257222101,AUTHORITY["EPSG","7019"]],TOWGS84[0,0,0,0,0,0,0],AUTHORITY["EPSG","1026"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","3824"]],PROJECTION["Transverse_Mercator"],PARAMETER["latitude_of_origin",0],PARAMETER["central_meridian",121],PARAMETER["scale_factor",0.9999],PARAMETER["false_easting",250000],PARAMETER["false_northing",0],UNIT["metre",1,AUTHORITY["EPSG","9001"]],AXIS["Easting",EAST],AXIS["Northing",NORTH],AUTHORITY["EPSG","3826"]]
     no_data_value: -32768.0
     metadata: {'AREA_OR_POINT': 'Area'}
+    >>> tgp.read_raster(raster_fp, window=(100, 200, 50, 60), bands=[0]).shape
+    (50, 60, 1)
     """
-    from TronGisPy import Raster
-    data = get_raster_data(fp)
-    rows, cols, bands, geo_transform, projection, gdaldtype, no_data_value, metadata = get_raster_info(fp)
-    raster = Raster(data, geo_transform, projection, gdaldtype, no_data_value, metadata)
+    ds = gdal.Open(fp)
+    if mmap:
+        assert (window is None) and (bands is None) and (extent is None) and (out_shape is None) and (overview_level is None), "mmap should not be set with window, bands, extent, out_shape or overview_level"
+        mode = mmap if type(mmap) == str else ('r+' if os.access(fp, os.W_OK) else 'r')
+        geo_transform, projection, metadata = ds.GetGeoTransform(), ds.GetProjection(), ds.GetMetadata()
+        gdaldtype = ds.GetRasterBand(1).DataType
+        no_data_value = ds.GetRasterBand(1).GetNoDataValue()
+        data = __get_mmap_data(ds, mode)
+        from TronGisPy import Raster
+        raster = Raster(data, geo_transform, projection, gdaldtype, no_data_value, metadata, copy=False)
+    else:
+        raster = read_gdal_ds(ds, window=window, bands=bands, extent=extent, out_shape=out_shape, overview_level=overview_level, resample_alg=resample_alg)
+    ds = None
     if fill_na and np.sum(np.isnan(raster.data)):
         raster.fill_na()
     return raster
 
-def write_raster(fp, data, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None):
+def __get_mmap_data(ds, mode='r'):
+    """Memory-map the pixel bytes of the gdal DataSource into (rows, cols, bands) 
+    `numpy.memmap`. The offset of the pixels is taken from the `BLOCK_OFFSET` 
+    metadata of GTiff driver or from the header file of ENVI/EHdr driver."""
+    rows, cols, bands = ds.RasterYSize, ds.RasterXSize, ds.RasterCount
+    dtype = np.dtype(tgp.gdaldtype_to_npdtype(ds.GetRasterBand(1).DataType))
+    driver = ds.GetDriver().ShortName
+    fp = ds.GetFileList()[0]
+    if driver == 'GTiff':
+        assert ds.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE') is None, "only uncompressed GeoTIFF can be memory-mapped"
+        block_cols, block_rows = ds.GetRasterBand(1).GetBlockSize()
+        assert block_cols == cols, "tiled GeoTIFF cannot be memory-mapped"
+        with open(fp, 'rb') as f:
+            little_endian = f.read(2) == b'II'
+        interleave = 'bip' if (bands == 1) or (ds.GetMetadataItem('INTERLEAVE', 'IMAGE_STRUCTURE') == 'PIXEL') else 'bsq'
+        offset = ds.GetRasterBand(1).GetMetadataItem('BLOCK_OFFSET_0_0', 'TIFF')
+        assert offset is not None, "cannot find the offset of the pixels"
+        offset = int(offset)
+        # the strips should be stored one after another without gaps
+        strip_size = block_rows * cols * dtype.itemsize * (bands if interleave == 'bip' else 1)
+        n_strips = int(np.ceil(rows / block_rows))
+        for b in range(1 if interleave == 'bip' else bands):
+            for i in range(n_strips):
+                strip_offset = ds.GetRasterBand(b+1).GetMetadataItem('BLOCK_OFFSET_0_{}'.format(i), 'TIFF')
+                expected_offset = offset + (b * rows * cols * dtype.itemsize) + (i * strip_size)
+                assert (strip_offset is not None) and (int(strip_offset) == expected_offset), "the strips of the GeoTIFF are not contiguous"
+    elif driver in ['ENVI', 'EHdr']:
+        hdr_fps = [f for f in ds.GetFileList() if f.lower().endswith('.hdr')]
+        assert len(hdr_fps) > 0, "cannot find the header file"
+        with open(hdr_fps[0]) as f:
+            lines = f.read().splitlines()
+        if driver == 'ENVI':
+            header = dict([(k.strip().lower(), v.strip().lower()) for k, v in [line.split('=', 1) for line in lines if '=' in line]])
+            offset = int(header.get('header offset', 0))
+            little_endian = header.get('byte order', '0') == '0'
+            interleave = header.get('interleave', 'bsq')
+        else:
+            header = dict([(line.split()[0].lower(), line.split()[1].lower()) for line in lines if len(line.split()) >= 2])
+            offset = int(header.get('skipbytes', 0))
+            little_endian = header.get('byteorder', 'i') in ['i', 'lsbfirst']
+            interleave = header.get('layout', 'bil')
+    else:
+        assert False, "{} driver cannot be memory-mapped".format(driver)
+    assert (dtype.itemsize == 1) or (little_endian == np.little_endian), "only the file in native byte order can be memory-mapped"
+
+    if interleave == 'bip':
+        return np.memmap(fp, dtype=dtype, mode=mode, offset=offset, shape=(rows, cols, bands))
+    elif interleave == 'bil':
+        return np.memmap(fp, dtype=dtype, mode=mode, offset=offset, shape=(rows, bands, cols)).transpose(0, 2, 1)
+    else: # bsq
+        return np.memmap(fp, dtype=dtype, mode=mode, offset=offset, shape=(bands, rows, cols)).transpose(1, 2, 0)
+
+def open_raster(fp):
+    """Open raster file as `TronGisPy.Raster` object without reading the digital 
+    numbers. The geo-information is read from the file immediately and the data 
+    will be read when `Raster.data` is touched. Use `Raster.read_window` to read 
+    only part of the data.
+
+    Parameters
+    ----------
+    fp: str 
+        File path of the raster file.
+
+    Returns
+    -------
+    raster: Raster
+        output raster whose data is not loaded yet.
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp 
+    >>> raster = tgp.open_raster(tgp.get_testing_fp()) 
+    >>> raster.shape
+    (677, 674, 3)
+    >>> raster.read_window((100, 200, 50, 60), bands=[0]).shape
+    (50, 60, 1)
+    """
+    from TronGisPy import Raster
+    return Raster(None, fp=fp)
+
+def iter_blocks(fp, block_size=None, overlap=0, bands=None):
+    """Iterate the raster file block by block for processing the raster larger than 
+    the memory. Each block is read from the file only when it is yielded.
+
+    Parameters
+    ----------
+    fp: str 
+        File path of the raster file.
+    block_size: int or tuple of int, optional
+        The (rows, cols) of each block. If None, use the native block size of the 
+        file (`band.GetBlockSize`). For striped file, several strips will be combined 
+        into one block of at least 256 rows.
+    overlap: int, optional, default: 0
+        The number of halo cells to be read around each block for neighbourhood 
+        operations. The halo is clipped by the boundary of the raster.
+    bands: list of int, optional
+        Which bands to read (start from 0). If None, read all bands.
+
+    Yields
+    ------
+    window: tuple of int
+        (row_off, col_off, rows, cols) of the block without the halo.
+    raster: Raster
+        The block with its halo. The block without the halo locates at 
+        `raster.data[r:r+rows, c:c+cols]` where `r, c = min(row_off, overlap), min(col_off, overlap)`.
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp 
+    >>> raster_fp = tgp.get_testing_fp()
+    >>> for window, raster in tgp.iter_blocks(raster_fp, block_size=256, overlap=1):
+    ...     row_off, col_off, rows, cols = window
+    ...     r, c = min(row_off, 1), min(col_off, 1)
+    ...     block_data = raster.data[r:r+rows, c:c+cols]
+    """
+    from TronGisPy import Raster
+    assert overlap >= 0, "overlap should not be negative"
+    ds = gdal.Open(fp)
+    rows, cols = ds.RasterYSize, ds.RasterXSize
+    geo_transform, projection, metadata = ds.GetGeoTransform(), ds.GetProjection(), ds.GetMetadata()
+    gdaldtype = ds.GetRasterBand(1).DataType
+    no_data_value = ds.GetRasterBand(1).GetNoDataValue()
+    if block_size is None:
+        block_cols, block_rows = ds.GetRasterBand(1).GetBlockSize()
+        if block_cols >= cols and block_rows < 256: # striped file
+            block_rows = block_rows * int(np.ceil(256 / block_rows))
+    elif type(block_size) == int:
+        block_rows = block_cols = block_size
+    else:
+        block_rows, block_cols = block_size
+
+    for row_off in range(0, rows, block_rows):
+        for col_off in range(0, cols, block_cols):
+            window = (row_off, col_off, min(block_rows, rows-row_off), min(block_cols, cols-col_off))
+            read_row_st, read_col_st = max(row_off-overlap, 0), max(col_off-overlap, 0)
+            read_row_end = min(row_off+window[2]+overlap, rows)
+            read_col_end = min(col_off+window[3]+overlap, cols)
+            read_window = (read_row_st, read_col_st, read_row_end-read_row_st, read_col_end-read_col_st)
+            data = __read_ds_data(ds, window=read_window, bands=bands)
+            read_geo_transform = get_window_geo_transform(geo_transform, read_window)
+            yield window, Raster(data, read_geo_transform, projection, gdaldtype, no_data_value, metadata, copy=False)
+    ds = None
+
+def write_raster(fp, data, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None, creation_options=None):
     """Write raster file.
 
     Parameters
@@ -203,49 +589,147 @@ def write_raster(fp, data, geo_transform=None, projection=None, gdaldtype=None,
         Define which value to replace nan in numpy array when saving a raster file.
     metadata: dict, optional
         Define the metadata of the raster file.
+    creation_options: list or dict, optional
+        GTiff creation options e.g. ['TILED=YES', 'COMPRESS=DEFLATE', 'PREDICTOR=2', 
+        'BIGTIFF=IF_SAFER']. See also `TronGisPy.RasterWriter`.
     """
     if len(data.shape) == 2:
         data = np.expand_dims(data, axis=2)
     rows, cols, bands = data.shape
     gdaldtype = tgp.npdtype_to_gdaldtype(data.dtype) if gdaldtype is None else gdaldtype
-    ds = gdal.GetDriverByName('GTiff').Create(fp, cols, rows, bands, gdaldtype) # dst_filename, xsize=512, ysize=512, bands=1, eType=gdal.GDT_Byte
-    if geo_transform is not None:
-        ds.SetGeoTransform(geo_transform)
-    if projection is not None:
-        ds.SetProjection(projection)
-    if metadata is not None:
-        ds.SetMetadata(metadata)
+    with tgp.RasterWriter(fp, rows, cols, bands, gdaldtype, geo_transform, projection, no_data_value, metadata, creation_options) as writer:
+        writer.write_window(data)
 
-    for b in range(bands):
-        band = ds.GetRasterBand(b+1)
-        band.WriteArray(data[:, :, b], 0, 0)
-        if no_data_value is not None:
-            band.SetNoDataValue(no_data_value)
-        band.FlushCache()
-    ds = None
+def write_cog(fp, data, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None, block_size=512, compress='DEFLATE', overview_resampling='average', overview_levels=None, creation_options=None):
+    """Write Cloud-Optimized GeoTIFF (COG) file which is tiled, compressed and 
+    contains internal overviews. Viewers can read the small overview instead of 
+    the full resolution data.
 
-def read_gdal_ds(ds):
+    Parameters
+    ----------
+    fp: str
+        File path of the raster file.
+    data: array_like
+        The digital number for each cell of the raster.  Data is in 
+        (n_rows, n_cols, n_bands) shape.
+    geo_transform: tuple or list, optional
+        Affine transform parameters (c, a, b, f, d, e = geo_transform). 
+    projection: str, optional
+        The well known text (WKT) of the raster which can be generate from `TronGisPy.epsg_to_wkt(<epsg_code>)`
+    gdaldtype: int, optional
+        The type of the cell defined in gdal which will affect the information 
+        to be stored when saving the file. This can be generate from `gdal.GDT_XXX` 
+        such as `gdal.GDT_Int32` equals 5 and `gdal.GDT_Float32` equals 6.
+    no_data_value: int or float, optional
+        Define which value to replace nan in numpy array when saving a raster file.
+    metadata: dict, optional
+        Define the metadata of the raster file.
+    block_size: int, optional, default: 512
+        The size of the internal tiles.
+    compress: {'DEFLATE', 'LZW', 'ZSTD', 'NONE'}, optional, default: DEFLATE
+        The compression method.
+    overview_resampling: {'nearest', 'average', 'bilinear', 'cubic', 'cubicspline', 'lanczos', 'mode', 'gauss'}, optional, default: average
+        The resampling algorithm used to build the overviews.
+    overview_levels: list of int, optional
+        The decimation factors of the overviews e.g. [2, 4, 8]. If None, keep halving 
+        the resolution until the overview fits in one tile.
+    creation_options: list or dict, optional
+        Extra GTiff creation options e.g. ['PREDICTOR=2'].
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp 
+    >>> raster = tgp.read_raster(tgp.get_testing_fp())
+    >>> tgp.write_cog('cog.tif', raster.data, raster.geo_transform, raster.projection, raster.gdaldtype, raster.no_data_value, block_size=256)
+    """
+    if len(data.shape) == 2:
+        data = np.expand_dims(data, axis=2)
+    rows, cols, bands = data.shape
+    src_ds = write_gdal_ds(data, geo_transform=geo_transform, projection=projection, gdaldtype=gdaldtype, no_data_value=no_data_value, metadata=metadata)
+    if overview_levels is None:
+        overview_levels = get_overview_levels(rows, cols, block_size)
+    if len(overview_levels) > 0:
+        src_ds.BuildOverviews(overview_resampling.upper(), list(overview_levels))
+    options = ['TILED=YES', 'BLOCKXSIZE={}'.format(block_size), 'BLOCKYSIZE={}'.format(block_size), 
+               'COMPRESS={}'.format(compress), 'COPY_SRC_OVERVIEWS=YES', 'BIGTIFF=IF_SAFER']
+    options += get_creation_options(creation_options)
+    dst_ds = gdal.GetDriverByName('GTiff').CreateCopy(fp, src_ds, options=options)
+    assert dst_ds is not None, "cannot create the raster file: " + str(fp)
+    dst_ds = None
+    src_ds = None
+
+def get_overview_levels(rows, cols, block_size=512):
+    """Get the decimation factors of the overviews by halving the resolution 
+    until the overview fits in one tile.
+
+    Parameters
+    ----------
+    rows: int
+        The number of rows in the raster.
+    cols: int
+        The number of cols in the raster.
+    block_size: int, optional, default: 512
+        The size of the internal tiles.
+
+    Returns
+    -------
+    overview_levels: list of int
+        The decimation factors e.g. [2, 4, 8].
+
+    Examples
+    --------
+    >>> import TronGisPy as tgp 
+    >>> tgp.get_overview_levels(5000, 3000, block_size=512)
+    [2, 4, 8, 16]
+    """
+    overview_levels, factor = [], 1
+    while max(rows, cols) / factor > block_size:
+        factor *= 2
+        overview_levels.append(factor)
+    return overview_levels
+
+def read_gdal_ds(ds, window=None, bands=None, extent=None, out_shape=None, overview_level=None, resample_alg='near'):
     """Read gdal DataSource as `TronGisPy.Raster` object.
 
     Parameters
     ----------
     ds: gdal.DataSource.
+    window: tuple of int, optional
+        Only read the cells in (row_off, col_off, rows, cols) window. The 
+        geo_transform of the output raster will be shifted to the window.
+    bands: list of int, optional
+        Which bands to read (start from 0). If None, read all bands.
+    extent: tuple, optional
+        Only read the cells covering the (xmin, ymin, xmax, ymax) extent. Should 
+        not be set with window at the same time.
+    out_shape: tuple of int, optional
+        Read the window into (rows, cols) shape. The existing overviews will be used by 
+        gdal if the resolution is reduced. The geo_transform will be scaled accordingly.
+    overview_level: int, optional
+        Read the window from the overview of the level (start from 0). Should not 
+        be set with out_shape at the same time.
+    resample_alg: {'near', 'bilinear', 'cubic', 'cubicspline', 'lanczos', 'average', 'mode', 'gauss'}, optional, default: near
+        The resampling algorithm when out_shape or overview_level is set.
 
     Returns
     -------
     raster: Raster.
         output raster.
     """
-    rows, cols, bands = ds.RasterYSize, ds.RasterXSize, ds.RasterCount
+    assert (window is None) or (extent is None), "should not set window and extent at the same time!"
+    rows, cols = ds.RasterYSize, ds.RasterXSize
     geo_transform, projection, metadata = ds.GetGeoTransform(), ds.GetProjection(), ds.GetMetadata()
     gdaldtype = ds.GetRasterBand(1).DataType
     no_data_value = ds.GetRasterBand(1).GetNoDataValue()
-    data = ds.ReadAsArray()
-    if len(data.shape) == 2:
-        data = np.expand_dims(data, axis=0)
-    data = np.transpose(data, axes=[1,2,0])
+    if extent is not None:
+        window = get_window_by_extent(rows, cols, geo_transform, extent)
+    out_shape = __get_out_shape(ds, window, out_shape, overview_level)
+    data = __read_ds_data(ds, window=window, bands=bands, out_shape=out_shape, resample_alg=resample_alg)
+    if (window is not None) or (out_shape is not None):
+        window = (0, 0, rows, cols) if window is None else window
+        geo_transform = get_window_geo_transform(geo_transform, window, out_shape)
     from TronGisPy import Raster
-    return Raster(data, geo_transform, projection, gdaldtype, no_data_value, metadata)
+    return Raster(data, geo_transform, projection, gdaldtype, no_data_value, metadata, copy=False)
 
 
 def write_gdal_ds(data=None, bands=None, cols=None, rows=None, geo_transform=None, projection=None, gdaldtype=None, no_data_value=None, metadata=None):
@@ -319,14 +803,12 @@ def write_gdal_ds(data=None, bands=None, cols=None, rows=None, geo_transform=Non
         for b in range(bands):
             band = ds.GetRasterBand(b+1)
             band.SetNoDataValue(no_data_value)
-            band.WriteArray(np.full((rows, cols), no_data_value), 0, 0)
-            band.FlushCache()
+            if (data is None) or (data.shape != (rows, cols, bands)): # the cells not covered by data
+                band.Fill(no_data_value)
     
     if data is not None:
-        for b in range(data.shape[2]):
-            band = ds.GetRasterBand(b+1)
-            band.WriteArray(data[:, :, b], 0, 0)
-            band.FlushCache()
+        write_ds_window(ds, data)
+        ds.FlushCache()
     return ds
 
 def remove_shp(shp_fp):
@@ -73,6 +73,25 @@ class Testio(unittest.TestCase):
         no_data_value = tgp.get_raster_info(dst_image_path, 'no_data_value')
         self.assertTrue(np.sum(clip_image_arr == no_data_value) == 42144)
 
+    def test_scan_rasters(self):
+        cache_fp = os.path.join(self.output_dir, 'scan_cache.pkl')
+        fps = [satellite_tif_path, tif_forinterpolation_path, satellite_tif_path]
+        for _ in range(2): # the second scan reads the cache
+            df_rasters = tgp.scan_rasters(fps, workers=2, cache_fp=cache_fp)
+            self.assertTrue(len(df_rasters) == 3)
+            self.assertTrue(df_rasters.loc[0, ['rows', 'cols', 'bands']].tolist() == [512, 512, 4])
+            self.assertTrue(df_rasters.loc[1, 'bands'] == tgp.get_raster_info(tif_forinterpolation_path, 'bands'))
+            self.assertTrue(df_rasters.loc[0, 'geometry'].bounds == (328530.0, 2745670.0, 333650.0, 2750790.0))
+        self.assertTrue(os.path.isfile(cache_fp))
+
+        # the file which cannot be opened is not cached, so it is scanned again after it is created
+        new_fp = os.path.join(self.output_dir, 'new.tif')
+        df_rasters = tgp.scan_rasters([satellite_tif_path, new_fp], cache_fp=cache_fp)
+        self.assertTrue(pd.isna(df_rasters.loc[1, 'rows']))
+        shutil.copy(satellite_tif_path, new_fp)
+        df_rasters = tgp.scan_rasters([satellite_tif_path, new_fp], cache_fp=cache_fp)
+        self.assertTrue(df_rasters.loc[1, 'rows'] == 512)
+
     def test_get_raster_extent(self):
         extent = tgp.get_raster_extent(satellite_tif_path, 'plot')
         self.assertTrue(extent == (328530.0, 333650.0, 2745670.0, 2750790.0))
@@ -108,6 +127,55 @@ class Testio(unittest.TestCase):
         raster = tgp.read_raster(tif_forinterpolation_path, fill_na=True)
         self.assertTrue(np.sum(raster.data == raster.no_data_value) == 34915)
 
+    def test_read_raster_window(self):
+        raster = tgp.read_raster(satellite_tif_path)
+        raster_window = tgp.read_raster(satellite_tif_path, window=(100, 200, 50, 60), bands=[1, 3])
+        self.assertTrue(raster_window.shape == (50, 60, 2))
+        self.assertTrue(np.all(raster_window.data == raster.data[100:150, 200:260][:, :, [1, 3]]))
+        self.assertTrue(raster_window.geo_transform == (330530.0, 10.0, 0.0, 2749790.0, 0.0, -10.0))
+
+        raster_extent = tgp.read_raster(satellite_tif_path, extent=(330530.0, 2749290.0, 331130.0, 2749790.0))
+        self.assertTrue(raster_extent.shape == (50, 60, 4))
+        self.assertTrue(raster_extent.geo_transform == raster_window.geo_transform)
+
+    def test_open_raster(self):
+        raster = tgp.open_raster(satellite_tif_path)
+        self.assertTrue(raster.fp == satellite_tif_path)
+        self.assertTrue(raster.shape == (512, 512, 4))
+        self.assertTrue(raster.geo_transform == (328530.0, 10.0, 0.0, 2750790.0, 0.0, -10.0))
+        self.assertTrue(raster.no_data_value == -99.0)
+        raster_window = raster.read_window((100, 200, 50, 60), bands=[0])
+        self.assertTrue(raster_window.shape == (50, 60, 1))
+        self.assertTrue(raster_window.geo_transform == (330530.0, 10.0, 0.0, 2749790.0, 0.0, -10.0))
+        self.assertTrue(np.all(raster.data == tgp.get_raster_data(satellite_tif_path)))
+        self.assertTrue(np.all(raster.read_window((100, 200, 50, 60), bands=[0]).data == raster_window.data))
+
+    def test_iter_blocks(self):
+        data = tgp.get_raster_data(satellite_tif_path)
+        data_combined = np.zeros_like(data)
+        n_blocks = 0
+        for (row_off, col_off, rows, cols), raster in tgp.iter_blocks(satellite_tif_path, block_size=200, overlap=2):
+            r, c = min(row_off, 2), min(col_off, 2)
+            self.assertTrue(raster.rows == min(row_off+rows+2, 512) - max(row_off-2, 0))
+            data_combined[row_off:row_off+rows, col_off:col_off+cols] = raster.data[r:r+rows, c:c+cols]
+            n_blocks += 1
+        self.assertTrue(n_blocks == 9)
+        self.assertTrue(np.all(data_combined == data))
+
+    def test_read_raster_out_shape(self):
+        data = tgp.get_raster_data(satellite_tif_path, out_shape=(128, 128))
+        self.assertTrue(data.shape == (128, 128, 4))
+        self.assertTrue(np.all(data == tgp.get_raster_data(satellite_tif_path)[2::4, 2::4])) # nearest takes the center cell
+        raster = tgp.read_raster(satellite_tif_path, window=(0, 0, 256, 512), out_shape=(128, 256))
+        self.assertTrue(raster.geo_transform == (328530.0, 20.0, 0.0, 2750790.0, 0.0, -20.0))
+
+        src_raster = tgp.read_raster(satellite_tif_path)
+        dst_tif_path = os.path.join(self.output_dir, 'cog.tif')
+        tgp.write_cog(dst_tif_path, src_raster.data, src_raster.geo_transform, src_raster.projection, src_raster.gdaldtype, block_size=128)
+        raster = tgp.read_raster(dst_tif_path, overview_level=1)
+        self.assertTrue(raster.shape == (128, 128, 4))
+        self.assertTrue(raster.geo_transform == (328530.0, 40.0, 0.0, 2750790.0, 0.0, -40.0))
+
     def test_write_raster(self):
         dst_image_path = os.path.join(self.output_dir, 'clipped_image.tif')
         GisIO.clip_tif_by_shp(satellite_tif_path, satellite_tif_clipper_path, dst_image_path)
@@ -130,6 +198,78 @@ class Testio(unittest.TestCase):
         test_output = tgp.get_raster_data(dst_tif_path)
         self.assertTrue(test_output.shape == (100, 100, 1))
 
+    def test_RasterWriter(self):
+        rows, cols, bands, geo_transform, projection, gdaldtype, no_data_value = tgp.get_raster_info(satellite_tif_path, ['rows', 'cols', 'bands', 'geo_transform', 'projection', 'gdaldtype', 'no_data_value'])
+        dst_tif_path = os.path.join(self.output_dir, 'tiled_image.tif')
+        creation_options = ['TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'COMPRESS=DEFLATE', 'PREDICTOR=2', 'BIGTIFF=IF_SAFER']
+        with tgp.RasterWriter(dst_tif_path, rows, cols, bands, gdaldtype, geo_transform, projection, no_data_value, creation_options=creation_options) as writer:
+            for window, raster in tgp.iter_blocks(satellite_tif_path, block_size=100):
+                writer.write_window(raster.data, window)
+        ds = gdal.Open(dst_tif_path)
+        self.assertTrue(ds.GetRasterBand(1).GetBlockSize() == [256, 256])
+        self.assertTrue(ds.GetMetadata('IMAGE_STRUCTURE')['COMPRESSION'] == 'DEFLATE')
+        ds = None
+        self.assertTrue(np.all(tgp.get_raster_data(dst_tif_path) == tgp.get_raster_data(satellite_tif_path)))
+        self.assertTrue(tgp.get_raster_info(dst_tif_path, 'no_data_value') == no_data_value)
+
+        dst_tif_path = os.path.join(self.output_dir, 'compressed_image.tif')
+        tgp.read_raster(satellite_tif_path).to_file(dst_tif_path, creation_options={'TILED':'YES', 'COMPRESS':'LZW'})
+        ds = gdal.Open(dst_tif_path)
+        self.assertTrue(ds.GetMetadata('IMAGE_STRUCTURE')['COMPRESSION'] == 'LZW')
+        ds = None
+
+    def test_write_cog(self):
+        raster = tgp.read_raster(satellite_tif_path)
+        dst_tif_path = os.path.join(self.output_dir, 'cog.tif')
+        tgp.write_cog(dst_tif_path, raster.data, raster.geo_transform, raster.projection, raster.gdaldtype, raster.no_data_value, block_size=128)
+        ds = gdal.Open(dst_tif_path)
+        band = ds.GetRasterBand(1)
+        self.assertTrue(band.GetBlockSize() == [128, 128])
+        self.assertTrue(band.GetOverviewCount() == 2)
+        self.assertTrue((band.GetOverview(1).YSize, band.GetOverview(1).XSize) == (128, 128))
+        ds = None
+        self.assertTrue(np.all(tgp.get_raster_data(dst_tif_path) == raster.data))
+
+        raster.to_file(dst_tif_path, cog=True, block_size=128)
+        ds = gdal.Open(dst_tif_path)
+        band = ds.GetRasterBand(1)
+        self.assertTrue(band.GetBlockSize() == [128, 128])
+        self.assertTrue(band.GetOverviewCount() == 2)
+        self.assertTrue((band.GetOverview(0).YSize, band.GetOverview(0).XSize) == (256, 256))
+        self.assertTrue(ds.GetMetadata('IMAGE_STRUCTURE')['COMPRESSION'] == 'DEFLATE')
+        ds = None
+
+        raster.to_file(dst_tif_path, cog=True, overview_levels=[2, 4, 8])
+        ds = gdal.Open(dst_tif_path)
+        self.assertTrue(ds.GetRasterBand(1).GetOverviewCount() == 3)
+        self.assertTrue(ds.GetRasterBand(1).GetOverview(2).XSize == 64)
+        ds = None
+
+    def test_write_raster_interleave(self):
+        data = tgp.get_raster_data(satellite_tif_path)
+        self.assertTrue(data.flags['C_CONTIGUOUS'])
+        dst_tif_path = os.path.join(self.output_dir, 'reversed_bands.tif')
+        tgp.write_raster(dst_tif_path, data[:, :, ::-1]) # non-contiguous view
+        self.assertTrue(np.all(tgp.get_raster_data(dst_tif_path) == data[:, :, ::-1]))
+        tgp.write_raster(dst_tif_path, data > 100)
+        self.assertTrue(np.all(tgp.get_raster_data(dst_tif_path) == (data > 100)))
+
+    def test_read_raster_mmap(self):
+        data = tgp.get_raster_data(satellite_tif_path)
+        for interleave in ['PIXEL', 'BAND']:
+            dst_tif_path = os.path.join(self.output_dir, 'mmap_{}.tif'.format(interleave))
+            tgp.write_raster(dst_tif_path, data, creation_options=['INTERLEAVE=' + interleave])
+            raster = tgp.read_raster(dst_tif_path, mmap=True)
+            self.assertTrue(isinstance(raster.data, np.memmap))
+            self.assertTrue(np.all(raster.data == data))
+            raster.data[:10, :10] = 0
+            raster.data.flush()
+            raster = None
+            self.assertTrue(np.all(tgp.get_raster_data(dst_tif_path)[:10, :10] == 0))
+        dst_tif_path = os.path.join(self.output_dir, 'compressed.tif')
+        tgp.write_raster(dst_tif_path, data, creation_options=['COMPRESS=DEFLATE'])
+        self.assertRaises(AssertionError, tgp.read_raster, dst_tif_path, mmap=True)
+
     def test_read_gdal_ds(self):
         data = tgp.get_raster_data(satellite_tif_path)
         geo_transform, projection, gdaldtype, no_data_value = tgp.get_raster_info(satellite_tif_path, ["geo_transform", "projection", "gdaldtype", "no_data_value"])
@@ -193,6 +333,10 @@ class TestRaster(unittest.TestCase):
         self.assertTrue(raster.shape == (3, 3, 1))
         self.assertTrue(raster.geo_transform == (0, 1, 0, 0, 0, -1))
         self.assertTrue(raster.metadata is None)
+
+        data = np.zeros((3, 3, 1))
+        self.assertTrue(np.shares_memory(tgp.Raster(data, copy=False).data, data))
+        self.assertFalse(np.shares_memory(tgp.Raster(data).data, data))
         
     def test__getitem__(self):
         ras_clipped = self.raster[100:356, 100:164]
@@ -294,6 +438,20 @@ class TestRaster(unittest.TestCase):
         raster_copy.geo_transform = [0, 1, 0, 0, 0, -1]
         self.assertTrue(self.raster.geo_transform == (328530.0, 10.0, 0.0, 2750790.0, 0.0, -10.0))
 
+        raster_shallow = self.raster.copy(deep=False)
+        self.assertTrue(np.shares_memory(raster_shallow.data, self.raster.data))
+        with self.assertRaises(ValueError):
+            raster_shallow.data[0, 0, 0] = -1
+        with self.assertRaises(ValueError):
+            self.raster.data[0, 0, 0] = -1
+        raster_shallow.fill_no_data(mode='constant', no_data_value=int(self.raster.data[0, 0, 0]), constant=-1)
+        self.assertFalse(np.shares_memory(raster_shallow.data, self.raster.data))
+        self.assertTrue(np.all(self.raster.data != -1))
+        raster_shallow = self.raster.copy(deep=False)
+        raster_shallow.data = raster_shallow.data
+        raster_shallow.data[0, 0, 0] = -1
+        self.assertTrue(self.raster.data[0, 0, 0] != -1)
+
     def test_refine_resolution(self):
         src_raster = tgp.read_raster(satellite_tif_path)
         dst_raster = src_raster.refine_resolution(dst_resolution=5, resample_alg='bilinear', rotate=True)
@@ -807,6 +965,26 @@ class TestInterpolation(unittest.TestCase):
             axes[1].set_title('interp')
             plt.show()
 
+    def test_interpolation_window_size(self):
+        X = np.arange(49).reshape(7, 7) % 3
+        X[2:5, 2:5] = 999
+        X_interp = Interpolation.majority_interpolation(X, no_data_value=999, window_size=5, loop_to_fill_all=False)
+        self.assertTrue(X_interp[3, 3] == np.bincount(X[1:6, 1:6][X[1:6, 1:6] != 999]).argmax())
+        self.assertTrue(np.all(X_interp[X != 999] == X[X != 999]))
+        X_interp = Interpolation.mean_interpolation(X.astype(float), no_data_value=999, window_size=7, loop_to_fill_all=False)
+        self.assertTrue(np.isclose(X_interp[3, 3], np.mean(X[X != 999])))
+        self.assertTrue(np.sum(X_interp == 999) == 0)
+
+    def test_interpolation_n_threads(self):
+        X = tgp.get_raster_data(tif_forinterpolation_path)[:, :, 0]
+        X[np.isnan(X)] = 999
+        X_interp = Interpolation.mean_interpolation(X, no_data_value=999, window_size=5)
+        X_interp_single = Interpolation.mean_interpolation(X, no_data_value=999, window_size=5, n_threads=1)
+        self.assertTrue(np.all(X_interp == X_interp_single))
+        X_interp = Interpolation.majority_interpolation(X.astype(int), no_data_value=999, window_size=5)
+        X_interp_single = Interpolation.majority_interpolation(X.astype(int), no_data_value=999, window_size=5, n_threads=1)
+        self.assertTrue(np.all(X_interp == X_interp_single))
+
     def test_gdal_fillnodata(self):
         raster = tgp.read_raster(tif_forinterpolation_path)
         raster.data[np.isnan(raster.data)] = 999
@@ -854,6 +1032,13 @@ class TestSplittedImage(unittest.TestCase):
         shape_test = self.splitted_image.padded_image.shape == (635, 635, 4)
         self.assertTrue(shape_test)
 
+    def test_tiles_view(self):
+        tiles = self.splitted_image.tiles_view()
+        self.assertTrue(tiles.shape == (4, 4, 254, 254, 4))
+        self.assertFalse(tiles.flags.writeable)
+        self.assertTrue(np.shares_memory(tiles, self.splitted_image.padded_image))
+        self.assertTrue(np.all(tiles.reshape(-1, 254, 254, 4) == self.splitted_image.get_splitted_images()))
+
     def test_apply(self):
         splitted_images = self.splitted_image.apply(lambda x:x*1.1, return_raster=True)
         if show_image:
@@ -863,20 +1048,126 @@ class TestSplittedImage(unittest.TestCase):
                 splitted_images[idx].plot(ax=ax)
             plt.show()
 
+    def test_apply_parallel(self):
+        splitted_images = self.splitted_image.apply(np.mean)
+        for backend in ['thread', 'process']:
+            splitted_images_parallel = self.splitted_image.apply(np.mean, n_jobs=2, backend=backend, chunksize=4)
+            self.assertTrue(splitted_images_parallel == splitted_images)
+
+    def test_apply_batched(self):
+        splitted_images = self.splitted_image.get_splitted_images()
+        results = self.splitted_image.apply_batched(lambda X: X.sum(axis=(1, 2, 3)), batch_size=5)
+        self.assertTrue(np.all(np.array(results) == splitted_images.sum(axis=(1, 2, 3))))
+
     def test_get_splitted_images(self):
         shape_test = self.splitted_image.get_splitted_images().shape == (16, 254, 254, 4)
         self.assertTrue(shape_test)
 
+    def test_iter_tiles(self):
+        splitted_images = self.splitted_image.get_splitted_images()
+        geo_transforms = self.splitted_image.get_geo_attribute(return_geo_transform=True)['geo_transform']
+        for idx, geo_transform, splitted_img in self.splitted_image.iter_tiles():
+            self.assertTrue(np.all(splitted_img == splitted_images[idx]))
+            self.assertTrue(geo_transform == geo_transforms[idx])
+        batch_sizes = [len(idxs) for idxs, _, splitted_imgs in self.splitted_image.iter_tiles(batch_size=5)]
+        self.assertTrue(batch_sizes == [5, 5, 5, 1])
+        idxs, geo_transforms, rasters = next(self.splitted_image.iter_tiles(batch_size=2, return_raster=True))
+        self.assertTrue(np.all(rasters[1].data == splitted_images[1]))
+
+    def test_rectangular_window(self):
+        splitted_image = SplittedImage(self.raster, (64, 254), step_size=(32, 127))
+        self.assertTrue(splitted_image.shape == (21, 5))
+        splitted_images = splitted_image.get_splitted_images()
+        self.assertTrue(splitted_images.shape == (105, 64, 254, 3))
+        self.assertTrue(np.all(splitted_images[6] == self.raster.data[32:96, 127:381]))
+        self.assertTrue(np.all(splitted_image[1, 1].data == splitted_images[6]))
+        self.assertTrue(np.isclose(splitted_image.get_geo_attribute().loc[0, 'geometry'].area, self.splitted_image.get_geo_attribute().loc[0, 'geometry'].area * 64 / 254))
+        X_combined = splitted_image.get_combined_image(splitted_images[..., 0], padding=0)
+        self.assertTrue(np.allclose(X_combined[:, :, 0], self.raster.data[:, :, 0]))
+
+    def test_get_valid_fractions(self):
+        data = self.raster.data.copy()
+        data[:300, :300] = -1
+        splitted_image = SplittedImage(tgp.Raster(data, self.raster.geo_transform, no_data_value=-1), self.box_size, step_size=self.step_size)
+        valid_fractions = splitted_image.get_valid_fractions()
+        self.assertTrue(valid_fractions[0] == 0)
+        self.assertTrue(np.isclose(valid_fractions[3], (512 - 381) / 254))
+        self.assertTrue(np.all(splitted_image.get_geo_attribute(return_valid_fraction=True)['valid_fraction'] == valid_fractions))
+        results = splitted_image.apply(np.mean, min_valid_fraction=0.5)
+        self.assertTrue([result is None for result in results] == (valid_fractions < 0.5).tolist())
+        self.assertTrue(len(list(splitted_image.iter_tiles(min_valid_fraction=0.5))) == np.sum(valid_fractions >= 0.5))
+        results = splitted_image.apply(lambda x: x[:, :, 0], min_valid_fraction=0.5)
+        X_combined = splitted_image.get_combined_image(results, padding=0, aggregator='median')
+        self.assertTrue(np.all(np.isnan(X_combined[:127, :127])))
+        self.assertTrue(np.all(X_combined[381:508, 381:508, 0] == data[381:508, 381:508, 0]))
+
+    def test_from_file(self):
+        splitted_image = SplittedImage.from_file(satellite_tif_path, self.box_size, step_size=self.step_size, cache_blocks=16)
+        for (idx, gt, tile), (idx_mem, gt_mem, tile_mem) in zip(splitted_image.iter_tiles(), self.splitted_image.iter_tiles()):
+            self.assertTrue((idx == idx_mem) and np.all(gt == gt_mem) and np.all(tile == tile_mem))
+        self.assertTrue(np.all(splitted_image[1:3, 1:3].data == self.splitted_image[1:3, 1:3].data))
+        self.assertTrue(np.all(splitted_image.get_valid_fractions() == self.splitted_image.get_valid_fractions()))
+        self.assertTrue(splitted_image.apply(np.mean, n_jobs=2) == self.splitted_image.apply(np.mean))
+
+        # the last splitted images start outside the raster when step_size > box_size
+        splitted_image = SplittedImage.from_file(satellite_tif_path, 64, step_size=300)
+        splitted_image_mem = SplittedImage(self.raster, 64, step_size=300)
+        for (idx, gt, tile), (idx_mem, gt_mem, tile_mem) in zip(splitted_image.iter_tiles(), splitted_image_mem.iter_tiles()):
+            self.assertTrue(np.all(tile == tile_mem))
+        self.assertTrue(splitted_image.apply(np.mean) == splitted_image_mem.apply(np.mean))
+
     def test_get_geo_attribute(self):
         df_attribute = self.splitted_image.get_geo_attribute()
         df_attribute.to_file(os.path.join(self.output_dir, "df_attribute.shp"))
         pol = df_attribute.loc[0, 'geometry']
+        self.assertTrue('valid_fraction' not in df_attribute.columns)
         self.assertTrue(pol.area == 6451600.0)
 
     def test_write_splitted_images(self):
         self.splitted_image.write_splitted_images(self.output_dir, 'test_satellite')
         self.assertTrue(len(os.listdir(self.output_dir)) == 16)
 
+        filtered_dir = os.path.join(self.output_dir, 'filtered')
+        os.mkdir(filtered_dir)
+        self.splitted_image.write_splitted_images(filtered_dir, 'test_satellite', filter_fun=lambda x:x.mean() > 0, idxs_to_be_kept=[0, 1, 5, 5], n_jobs=2)
+        self.assertTrue(sorted(os.listdir(filtered_dir)) == ['test_satellite_000_000_000.tif', 'test_satellite_001_000_001.tif', 'test_satellite_005_001_001.tif'])
+        raster = tgp.read_raster(os.path.join(filtered_dir, 'test_satellite_005_001_001.tif'))
+        self.assertTrue(np.all(raster.data == self.splitted_image.get_splitted_images()[5]))
+
+    def test_export_tiles(self):
+        tiles_path = os.path.join(self.output_dir, 'tiles.npy')
+        df_index = self.splitted_image.export_tiles(tiles_path, format='npy_stack', batch_size=5)
+        tiles = np.load(tiles_path, mmap_mode='r')
+        self.assertTrue(np.all(tiles == self.splitted_image.get_splitted_images()))
+        self.assertTrue(df_index[['idx_h', 'idx_w']].values.tolist()[5] == [1, 1])
+        df_index_csv = pd.read_csv(os.path.join(self.output_dir, 'tiles_index.csv'))
+        self.assertTrue(len(df_index_csv) == 16)
+
+    def test_export_tiles_zarr(self):
+        try:
+            import zarr
+        except ImportError:
+            self.skipTest("zarr is not installed")
+        tiles_path = os.path.join(self.output_dir, 'tiles.zarr')
+        self.splitted_image.export_tiles(tiles_path, format='zarr', chunks=(2, 254, 254, 4), batch_size=5)
+        tiles = zarr.open(tiles_path, mode='r')
+        self.assertTrue(tiles.chunks == (2, 254, 254, 4))
+        self.assertTrue(np.all(tiles[:] == self.splitted_image.get_splitted_images()))
+        self.assertTrue(os.path.isfile(os.path.join(self.output_dir, 'tiles_index.csv')))
+
+    def test_export_tiles_hdf5(self):
+        try:
+            import h5py
+        except ImportError:
+            self.skipTest("h5py is not installed")
+        tiles_path = os.path.join(self.output_dir, 'tiles.h5')
+        self.splitted_image.export_tiles(tiles_path, format='hdf5', compression='gzip', batch_size=5)
+        with h5py.File(tiles_path, 'r') as h5_file: # the file should have been closed by export_tiles
+            tiles = h5_file['tiles']
+            self.assertTrue(tiles.chunks == (1, 254, 254, 4))
+            self.assertTrue(tiles.compression == 'gzip')
+            self.assertTrue(np.all(tiles[:] == self.splitted_image.get_splitted_images()))
+
     def test_get_combined_image(self):
         X_pred = self.splitted_image.get_splitted_images()
         X_combined = self.splitted_image.get_combined_image(X_pred, padding=3, aggregator='mean')
@@ -886,6 +1177,29 @@ class TestSplittedImage(unittest.TestCase):
             plt.title("TestSplittedImage" + ": " + "test_get_combined_image")
             plt.show()
 
+    def test_TileAccumulator(self):
+        X_pred = self.splitted_image.get_splitted_images().astype(np.float32)
+        X_pred[0, 100:120, 100:120] = np.nan
+        X_combined = self.splitted_image.get_combined_image(X_pred, padding=3, aggregator='mean')
+        accumulator = tgp.TileAccumulator(self.splitted_image, padding=3, aggregator='mean', dtype=np.float32)
+        for idx, X_i in enumerate(X_pred):
+            accumulator.add(idx, X_i)
+        X_accumulated = accumulator.get_combined_image()
+        self.assertTrue(X_accumulated.dtype == np.float32)
+        self.assertTrue(np.allclose(X_accumulated, X_combined, equal_nan=True))
+        X_generated = self.splitted_image.get_combined_image((X_i for X_i in X_pred), padding=3, aggregator='max', dtype=np.float32)
+        self.assertTrue(np.nansum(X_generated - self.splitted_image.src_image) == 0)
+
+    def test_get_combined_image_blending(self):
+        X_pred = self.splitted_image.get_splitted_images()
+        for blending in ['hann', 'gaussian', 'linear']:
+            X_combined = self.splitted_image.get_combined_image(X_pred, padding=0, aggregator='mean', blending=blending)
+            self.assertTrue(np.allclose(X_combined, self.splitted_image.src_image))
+        from TronGisPy.SplittedImage import get_blending_weights
+        weights = get_blending_weights('hann', 254, 254)
+        self.assertTrue(weights is get_blending_weights('hann', 254, 254))
+        self.assertTrue((weights.shape == (254, 254)) and (weights.min() > 0) and (weights.max() == 1))
+
     def test_write_combined_tif(self):
         X_pred = self.splitted_image.get_splitted_images()
         dst_tif_path = os.path.join(self.output_dir, "combined.tif")
@@ -894,6 +1208,12 @@ class TestSplittedImage(unittest.TestCase):
         self.assertTrue((rows, cols, bands) == (512, 512, 4))
         self.assertTrue(geo_transform == (328530.0, 10.0, 0.0, 2750790.0, 0.0, -10.0))
 
+        X_generator = (splitted_img[:, :, 0] * 0.5 for idx, gt, splitted_img in self.splitted_image.iter_tiles())
+        self.splitted_image.write_combined_tif(X_generator, dst_tif_path, gdaldtype=gdal.GDT_Float32, no_data_value=-1, creation_options=['TILED=YES', 'COMPRESS=DEFLATE'])
+        X_combined = self.splitted_image.get_combined_image(X_pred[:, :, :, 0] * 0.5)
+        X_combined[np.isnan(X_combined)] = -1
+        self.assertTrue(np.allclose(tgp.get_raster_data(dst_tif_path), X_combined))
+
 class TestGisIO(unittest.TestCase):
     def setUp(self):
         print("\nIn method", self._testMethodName)